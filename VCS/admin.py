@@ -5,8 +5,9 @@ from .models import (
     Subscription, Invoice, Appointment, MockInterviewFeedback,
     CalendarEvent, Interaction, SupportQuery, Notification,
     ChatQuestionAnswer, CandidateChat, ChatEscalation,
-    Badge, UserBadge, AnnualReview, SavedJob
+    Badge, UserBadge, AnnualReview, SavedJob, EmailOutbox
 )
+from .notifications import recount_unread
 
 # Custom admin for Job
 @admin.register(Job)
@@ -43,9 +44,9 @@ class AppointmentAdmin(admin.ModelAdmin):
 # Custom admin for Invoice
 @admin.register(Invoice)
 class InvoiceAdmin(admin.ModelAdmin):
-    list_display = ('invoice_number', 'user', 'subscription', 'amount', 'paid', 'date')
+    list_display = ('invoice_number', 'user', 'subscription', 'amount', 'paid', 'render_status', 'date')
     search_fields = ('invoice_number', 'user__username', 'subscription__plan_name')
-    list_filter = ('paid', 'date')
+    list_filter = ('paid', 'render_status', 'date')
     readonly_fields = ('invoice_number', 'date')
 
 # Custom admin for SupportQuery
@@ -55,6 +56,38 @@ class SupportQueryAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'subject', 'message')
     list_filter = ('priority', 'resolved', 'created_at')
 
+# Custom admin for EmailOutbox
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    search_fields = ('subject', 'recipients')
+    list_filter = ('status', 'created_at')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
+# Custom admin for Notification: bulk actions bypass Notification.save/delete,
+# so the affected users' unread counters are recomputed afterwards.
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'message', 'is_read', 'created_at')
+    search_fields = ('user__username', 'message')
+    list_filter = ('is_read', 'created_at')
+    actions = ['mark_read', 'mark_unread']
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        recount_unread(user_ids)
+
+    @admin.action(description="Mark selected notifications as read")
+    def mark_read(self, request, queryset):
+        queryset.update(is_read=True)
+        recount_unread(set(queryset.values_list('user_id', flat=True)))
+
+    @admin.action(description="Mark selected notifications as unread")
+    def mark_unread(self, request, queryset):
+        queryset.update(is_read=False)
+        recount_unread(set(queryset.values_list('user_id', flat=True)))
+
 # Basic registrations for other models (no custom admin needed for simplicity)
 admin.site.register(Course)
 admin.site.register(ProgressStep)
@@ -66,7 +99,6 @@ admin.site.register(Subscription)
 admin.site.register(MockInterviewFeedback)
 admin.site.register(CalendarEvent)
 admin.site.register(Interaction)
-admin.site.register(Notification)
 admin.site.register(ChatQuestionAnswer)
 admin.site.register(CandidateChat)
 admin.site.register(ChatEscalation)
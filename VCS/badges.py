@@ -0,0 +1,253 @@
+"""
+Badge criteria DSL.
+
+A Badge.criteria value is a rule string such as "applications >= 10", several
+rules joined with "and" ("applications >= 10 and certificates >= 1"), or a
+JSON list of rule strings that must all hold. Each rule compares one of the
+METRICS below with an integer. Criteria are compiled once into a set of
+per-user count annotations plus a Q filter, so a badge is evaluated for every
+user in a single aggregated query.
+"""
+import json
+import logging
+import re
+import time
+from collections import defaultdict
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import (Appointment, Badge, CandidateChat, Certificate, Enrollment,
+                     Job, JobApplication, Referral, TaskWatermark, UserBadge)
+from .notifications import fan_out
+
+logger = logging.getLogger(__name__)
+
+
+def _count(queryset, user_path):
+    """Correlated COUNT subquery of `queryset` rows belonging to the outer user."""
+    counts = queryset.filter(**{user_path: OuterRef('pk')}).order_by().values(user_path).annotate(
+        c=Count('pk')
+    ).values('c')[:1]
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+METRICS = {
+    'applications': lambda: _count(JobApplication.objects.all(), 'user'),
+    'hired': lambda: _count(JobApplication.objects.filter(status='HIRED'), 'user'),
+    'enrollments': lambda: _count(Enrollment.objects.all(), 'profile__user'),
+    'courses_completed': lambda: _count(Enrollment.objects.filter(status='CERTIFIED'), 'profile__user'),
+    'certificates': lambda: _count(Certificate.objects.all(), 'enrollment__profile__user'),
+    'referrals': lambda: _count(Referral.objects.all(), 'referrer'),
+    'saved_jobs': lambda: _count(Job.saved_by.through.objects.all(), 'user'),
+    'mock_interviews': lambda: _count(
+        Appointment.objects.filter(is_mock_interview=True), 'application__user'
+    ),
+    'chat_questions': lambda: _count(CandidateChat.objects.all(), 'candidate'),
+}
+
+OPERATORS = {
+    '>=': 'gte',
+    '>': 'gt',
+    '<=': 'lte',
+    '<': 'lt',
+    '==': 'exact',
+    '!=': 'exact',
+}
+
+RULE_RE = re.compile(r'^\s*([a-z_]+)\s*(>=|<=|==|!=|>|<)\s*(\d+)\s*$')
+
+
+class CompiledCriteria:
+    def __init__(self, rules):
+        self.rules = rules
+        self.metrics = sorted({metric for metric, _, _ in rules})
+
+    def annotations(self):
+        return {f"badge_{metric}": METRICS[metric]() for metric in self.metrics}
+
+    def condition(self):
+        q = Q()
+        for metric, op, value in self.rules:
+            rule = Q(**{f"badge_{metric}__{OPERATORS[op]}": value})
+            q &= ~rule if op == '!=' else rule
+        return q
+
+    def matching_users(self, users):
+        return users.annotate(**self.annotations()).filter(self.condition())
+
+
+def _normalize(criteria):
+    if isinstance(criteria, str):
+        try:
+            decoded = json.loads(criteria)
+        except ValueError:
+            return criteria
+        return _normalize(decoded)
+    if isinstance(criteria, list) and all(isinstance(rule, str) for rule in criteria):
+        return " and ".join(criteria)
+    raise ValueError(f"Unsupported badge criteria: {criteria!r}")
+
+
+@lru_cache(maxsize=256)
+def _compile(expression):
+    rules = []
+    for clause in re.split(r'\s+and\s+', expression.strip()):
+        match = RULE_RE.match(clause)
+        if not match:
+            raise ValueError(f"Invalid badge rule: {clause!r}")
+        metric, op, value = match.groups()
+        if metric not in METRICS:
+            raise ValueError(f"Unknown badge metric: {metric!r}")
+        rules.append((metric, op, int(value)))
+    return CompiledCriteria(tuple(rules))
+
+
+def compile_criteria(criteria):
+    """Parse a Badge.criteria value; raises ValueError if it is not valid DSL."""
+    return _compile(_normalize(criteria))
+
+
+def award_badges(users=None, badges=None):
+    """
+    Award every badge in `badges` (default: all) to the users in `users`
+    (default: all) that meet its criteria and do not hold it yet. Runs one
+    aggregated query per badge and inserts with bulk_create. Returns the list
+    of UserBadge rows actually inserted by this call.
+    """
+    users = users if users is not None else User.objects.all()
+    badges = badges if badges is not None else Badge.objects.all()
+
+    awarded = []
+    for badge in badges:
+        try:
+            compiled = compile_criteria(badge.criteria)
+        except ValueError as e:
+            logger.warning(f"Skipping badge {badge.pk} ({badge.name}): {e}")
+            continue
+
+        with transaction.atomic():
+            # Concurrent runs award the same badge one at a time, so the rows
+            # found below that were not held before are the ones inserted here.
+            Badge.objects.select_for_update().filter(pk=badge.pk).exists()
+            user_ids = list(compiled.matching_users(users).exclude(
+                userbadge__badge=badge
+            ).values_list('pk', flat=True))
+            if not user_ids:
+                continue
+            held = set(UserBadge.objects.filter(
+                badge=badge, user_id__in=user_ids
+            ).values_list('user_id', flat=True))
+            UserBadge.objects.bulk_create(
+                [UserBadge(user_id=user_id, badge=badge) for user_id in user_ids if user_id not in held],
+                ignore_conflicts=True, batch_size=1000,
+            )
+            awarded += UserBadge.objects.filter(
+                badge=badge, user_id__in=user_ids
+            ).exclude(user_id__in=held).select_related('badge')
+    return awarded
+
+
+# Rows whose timestamp marks a change in one of the METRICS above:
+# (model, path to the user, timestamp field). Saved jobs have no timestamp
+# and are picked up through the save_job event instead.
+ACTIVITY = [
+    (JobApplication, 'user', 'updated_at'),
+    (Enrollment, 'profile__user', 'enrolled_at'),
+    (Enrollment, 'profile__user', 'completed_at'),
+    (Certificate, 'enrollment__profile__user', 'issued_at'),
+    (Referral, 'referrer', 'created_at'),
+    (Appointment, 'application__user', 'created_at'),
+    (CandidateChat, 'candidate', 'created_at'),
+]
+
+WATERMARK = 'award_badges'
+
+# Re-scan a little before the stored watermark so rows stamped just before
+# the previous run but committed after it are not missed. Awards are
+# idempotent, so the overlap only costs a few extra evaluations.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def changed_users(since):
+    """Users with activity after `since`, or every active user if it is None."""
+    users = User.objects.filter(is_active=True)
+    if since is None:
+        return users
+    q = Q(date_joined__gt=since)
+    for model, user_path, field in ACTIVITY:
+        q |= Q(pk__in=model.objects.filter(**{f"{field}__gt": since}).values(user_path))
+    return users.filter(q)
+
+
+def notify_awards(awarded):
+    """One notification per new badge, fanned out per badge with bulk_create."""
+    by_badge = defaultdict(list)
+    for user_badge in awarded:
+        by_badge[user_badge.badge].append(user_badge.user_id)
+    for badge, user_ids in by_badge.items():
+        fan_out(User.objects.filter(pk__in=user_ids), f"You earned the '{badge.name}' badge!")
+
+
+def award_badges_since_watermark(batch_size=None):
+    """
+    Evaluate badges for users whose activity changed since the last run, in
+    chunks of BADGE_AWARD_BATCH_SIZE users, then advance the watermark.
+    Returns (users processed, badges awarded).
+    """
+    batch_size = batch_size or settings.BADGE_AWARD_BATCH_SIZE
+    run_started = timezone.now()
+    since = TaskWatermark.get(WATERMARK)
+    if since is not None:
+        since -= WATERMARK_OVERLAP
+
+    badges = list(Badge.objects.all())
+    user_ids = changed_users(since).order_by('pk').values_list('pk', flat=True)
+
+    started = time.perf_counter()
+    processed, awarded = 0, 0
+    for user_ids in _chunks(user_ids.iterator(chunk_size=batch_size), batch_size):
+        new = award_badges(User.objects.filter(pk__in=user_ids), badges)
+        notify_awards(new)
+        processed += len(user_ids)
+        awarded += len(new)
+
+    TaskWatermark.advance(WATERMARK, run_started)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Evaluated %s badges for %s users in %.2fs (%.0f users/s), awarded %s",
+        len(badges), processed, elapsed, processed / elapsed if elapsed else 0, awarded,
+    )
+    return processed, awarded
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def queue_badge_check(user_id):
+    """Evaluate one user's badges in the background once the current transaction commits."""
+    from .tasks import award_user_badges
+
+    def _queue():
+        try:
+            award_user_badges.delay(user_id)
+        except Exception as e:
+            # The periodic run will pick the user up.
+            logger.warning(f"Could not queue badge check for user {user_id}: {e}")
+
+    transaction.on_commit(_queue)
@@ -0,0 +1,135 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+
+class NamespacedCache:
+    """
+    Thin wrapper around a Django cache that keeps every key of a subsystem
+    under its own prefix and version (see CACHE_NAMESPACES in settings). The
+    version also carries the backend's VERSION, so bumping CACHE_VERSION
+    still invalidates every namespace.
+    """
+
+    def __init__(self, namespace, alias='default'):
+        self.namespace = namespace
+        self.alias = alias
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def version(self):
+        return f"{self.backend.version}.{settings.CACHE_NAMESPACES.get(self.namespace, 1)}"
+
+    def make_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def get(self, key, default=None):
+        return self.backend.get(self.make_key(key), default, version=self.version)
+
+    def set(self, key, value, timeout=None):
+        if timeout is None:
+            self.backend.set(self.make_key(key), value, version=self.version)
+        else:
+            self.backend.set(self.make_key(key), value, timeout, version=self.version)
+
+    def add(self, key, value, timeout=None):
+        if timeout is None:
+            return self.backend.add(self.make_key(key), value, version=self.version)
+        return self.backend.add(self.make_key(key), value, timeout, version=self.version)
+
+    def get_or_set(self, key, default, timeout=None):
+        if timeout is None:
+            return self.backend.get_or_set(self.make_key(key), default, version=self.version)
+        return self.backend.get_or_set(self.make_key(key), default, timeout, version=self.version)
+
+    def delete(self, key):
+        return self.backend.delete(self.make_key(key), version=self.version)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        found = self.backend.get_many([self.make_key(k) for k in keys], version=self.version)
+        prefix = len(self.namespace) + 1
+        return {k[prefix:]: v for k, v in found.items()}
+
+    def set_many(self, data, timeout=None):
+        data = {self.make_key(k): v for k, v in data.items()}
+        if timeout is None:
+            return self.backend.set_many(data, version=self.version)
+        return self.backend.set_many(data, timeout, version=self.version)
+
+    def delete_many(self, keys):
+        self.backend.delete_many([self.make_key(k) for k in keys], version=self.version)
+
+    def incr(self, key, delta=1):
+        return self.backend.incr(self.make_key(key), delta, version=self.version)
+
+    def decr(self, key, delta=1):
+        return self.backend.decr(self.make_key(key), delta, version=self.version)
+
+
+def get_cache(namespace):
+    return NamespacedCache(namespace)
+
+
+def cache_stats(alias='default'):
+    """
+    Health and usage numbers for the operator view: a timed set/get/delete
+    round trip plus whatever the configured backend can report cheaply.
+    """
+    config = settings.CACHES[alias]
+    backend = caches[alias]
+    stats = {
+        'alias': alias,
+        'backend': config['BACKEND'].rsplit('.', 1)[-1],
+        'location': str(config.get('LOCATION', '')),
+        'key_prefix': config.get('KEY_PREFIX', ''),
+        'version': config.get('VERSION', 1),
+        'namespaces': settings.CACHE_NAMESPACES,
+    }
+
+    probe_key = f"health:{os.getpid()}:{time.time()}"
+    try:
+        started = time.perf_counter()
+        backend.set(probe_key, 'ok', 10)
+        value = backend.get(probe_key)
+        backend.delete(probe_key)
+        stats['roundtrip_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        stats['healthy'] = value == 'ok'
+    except Exception as e:
+        stats['healthy'] = False
+        stats['error'] = str(e)
+        return stats
+
+    if stats['backend'] == 'FileBasedCache':
+        entries, size = 0, 0
+        for entry in os.scandir(config['LOCATION']):
+            if entry.name.endswith('.djcache'):
+                entries += 1
+                size += entry.stat().st_size
+        stats['entries'] = entries
+        stats['size_bytes'] = size
+    elif stats['backend'] == 'DatabaseCache':
+        table = connection.ops.quote_name(config['LOCATION'])
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            stats['entries'] = cursor.fetchone()[0]
+    elif stats['backend'] == 'RedisCache':
+        info = backend._cache.get_client().info()
+        stats['entries'] = sum(
+            db.get('keys', 0) for name, db in info.items() if name.startswith('db')
+        )
+        stats['used_memory'] = info.get('used_memory_human')
+        stats['hits'] = info.get('keyspace_hits')
+        stats['misses'] = info.get('keyspace_misses')
+        stats['connected_clients'] = info.get('connected_clients')
+    elif stats['backend'] == 'LocMemCache':
+        stats['entries'] = len(backend._cache)
+        stats['per_process'] = True
+
+    return stats
@@ -1,20 +1,17 @@
-from .models import Notification
+from django.conf import settings
+
+from .notifications import unread_count, latest_notifications
 
 def notification_count(request):
     if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-
-        latest_notifications = Notification.objects.filter(
-            user=request.user
-        ).order_by('-created_at')[:5]
+        unread = unread_count(request.user)
+        latest = latest_notifications(request.user)
     else:
-        unread_count = 0
-        latest_notifications = []
+        unread = 0
+        latest = []
 
     return {
-        'notification_count': unread_count,
-        'latest_notifications': latest_notifications,
+        'notification_count': unread,
+        'latest_notifications': latest,
+        'notification_poll_interval': settings.NOTIFICATION_POLL_INTERVAL,
     }
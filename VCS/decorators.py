@@ -1,14 +1,16 @@
 import time
 from functools import wraps
 from django.http import JsonResponse
-from django.core.cache import cache
+from .cache import get_cache
+
+cache = get_cache('ratelimit')
 
 def rate_limit(rate='5/m'):
     def decorator(view_func):
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
             ip = request.META.get('REMOTE_ADDR')
-            key = f"ratelimit:{ip}:{view_func.__name__}"
+            key = f"{ip}:{view_func.__name__}"
             requests = cache.get(key, [])
             now = time.time()
             window = 60 if 'm' in rate else 3600  
@@ -0,0 +1,224 @@
+"""
+Authenticated file downloads.
+
+serve_file() streams a stored file with validators (ETag, Last-Modified),
+answers conditional GETs with 304 and single byte ranges with 206. With
+DOWNLOADS_SENDFILE set, the body is handed off to the front-end server via
+X-Sendfile or X-Accel-Redirect instead of being streamed by Django.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (FileResponse, HttpResponse, HttpResponseNotModified,
+                         StreamingHttpResponse)
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from .models import Certificate, Invoice, JobApplication, MockInterviewFeedback, Profile
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _is_staff(user):
+    return user.is_staff or user.is_superuser
+
+
+def _is_recruiter(user):
+    return _is_staff(user) or user.groups.filter(name='Recruiter').exists()
+
+
+# kind -> (queryset, file field, owner check, reviewer check). Besides the
+# owner, recruiters may download candidate material; billing documents and
+# certificates are limited to staff.
+PROTECTED_FILES = {
+    'invoice': (
+        lambda: Invoice.objects.select_related('user', 'subscription'),
+        'file',
+        lambda obj, user: obj.user_id == user.pk,
+        _is_staff,
+    ),
+    'resume': (
+        lambda: Profile.objects.all(),
+        'resume',
+        lambda obj, user: obj.user_id == user.pk,
+        _is_recruiter,
+    ),
+    'application-resume': (
+        lambda: JobApplication.objects.all(),
+        'resume',
+        lambda obj, user: obj.user_id == user.pk,
+        _is_recruiter,
+    ),
+    'feedback': (
+        lambda: MockInterviewFeedback.objects.select_related('appointment__application'),
+        'feedback_report',
+        lambda obj, user: user.pk in (
+            obj.appointment.consultant_id,
+            obj.appointment.application.user_id if obj.appointment.application else None,
+        ),
+        _is_recruiter,
+    ),
+    'certificate': (
+        lambda: Certificate.objects.select_related('enrollment__profile'),
+        'certificate_file',
+        lambda obj, user: obj.enrollment.profile.user_id == user.pk,
+        _is_staff,
+    ),
+}
+
+
+def get_protected_file(kind, pk, user):
+    """
+    The object and file field for a download, or (None, None) if the kind or
+    object does not exist or the user may not see it.
+    """
+    try:
+        queryset, field, is_owner, is_reviewer = PROTECTED_FILES[kind]
+    except KeyError:
+        return None, None
+    obj = queryset().filter(pk=pk).first()
+    if obj is None or not (is_owner(obj, user) or is_reviewer(user)):
+        return None, None
+    return obj, getattr(obj, field)
+
+
+def file_validators(field_file):
+    """(ETag, Last-Modified timestamp) derived from the stored file's name, size and mtime."""
+    storage = field_file.storage
+    size = field_file.size
+    try:
+        modified = storage.get_modified_time(field_file.name).timestamp()
+    except NotImplementedError:
+        modified = None
+    digest = hashlib.md5(f"{field_file.name}:{size}:{modified}".encode()).hexdigest()
+    return f'"{digest}"', (int(modified) if modified is not None else None), size
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return bool(last_modified and if_modified_since and last_modified <= if_modified_since)
+
+
+def _parse_range(request, size, etag, last_modified):
+    """
+    (start, end) inclusive for a satisfiable single-range request, None to
+    send the whole file, or False if the range cannot be satisfied.
+    """
+    header = request.META.get('HTTP_RANGE')
+    if not header or request.method != 'GET':
+        return None
+
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range:
+        if_range_date = parse_http_date_safe(if_range)
+        if if_range_date is None and if_range.strip() != etag:
+            return None
+        if if_range_date is not None and if_range_date != last_modified:
+            return None
+
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: ignore and send the full body.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(f, start, length):
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _content_disposition(filename, as_attachment):
+    disposition = 'attachment' if as_attachment else 'inline'
+    try:
+        filename.encode('ascii')
+        return f'{disposition}; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"{disposition}; filename*=utf-8''{quote(filename)}"
+
+
+def _sendfile_response(field_file):
+    mode = settings.DOWNLOADS_SENDFILE
+    response = HttpResponse()
+    if mode == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.DOWNLOADS_ACCEL_PREFIX.rstrip('/') + '/' + field_file.name
+    else:
+        response['X-Sendfile'] = field_file.path
+    # Let the front-end server fill in type and length from the file.
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, field_file, filename=None, as_attachment=False):
+    """Response for a stored FieldFile, honouring validators, ranges and sendfile mode."""
+    filename = filename or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    etag, last_modified, size = file_validators(field_file)
+
+    if _not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+    elif settings.DOWNLOADS_SENDFILE:
+        response = _sendfile_response(field_file)
+        response['Content-Disposition'] = _content_disposition(filename, as_attachment)
+    else:
+        byte_range = _parse_range(request, size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{size}"
+        elif byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _read_range(field_file.open('rb'), start, length),
+                status=206,
+                content_type=content_type,
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f"bytes {start}-{end}/{size}"
+            response['Content-Disposition'] = _content_disposition(filename, as_attachment)
+        else:
+            response = FileResponse(
+                field_file.open('rb'),
+                content_type=content_type,
+                as_attachment=as_attachment,
+                filename=filename,
+            )
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Per-user content: browsers may keep it but must revalidate, shared caches must not.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,124 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, message, from_email, recipient_list):
+    """
+    Drop-in replacement for send_mail() inside views: the message is written
+    to the outbox as part of the current transaction and delivered by the
+    drain_email_outbox task once it commits. With eager tasks (local
+    development without a broker, so no beat either) that drain runs inline
+    after the commit.
+    """
+    recipients = [r for r in recipient_list if r]
+    if not recipients:
+        return None
+
+    email = EmailOutbox.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=recipients,
+    )
+    transaction.on_commit(_kick_worker)
+    return email
+
+
+def _kick_worker():
+    from .tasks import drain_email_outbox
+
+    try:
+        drain_email_outbox.delay()
+    except Exception as e:
+        # The periodic drain will pick the message up.
+        logger.warning(f"Could not queue outbox drain: {e}")
+
+
+def _claim_batch(batch_size):
+    """
+    Lease up to batch_size due messages to this worker. A lease that is not
+    released (worker crashed mid-send) expires and the rows become due again.
+    """
+    now = timezone.now()
+    due = EmailOutbox.objects.filter(
+        Q(status='PENDING') | Q(status='SENDING'),
+        next_attempt_at__lte=now,
+    ).order_by('next_attempt_at')
+    ids = list(due.values_list('id', flat=True)[:batch_size])
+    lease = now + timedelta(minutes=10)
+    EmailOutbox.objects.filter(id__in=ids, next_attempt_at__lte=now).exclude(
+        status__in=['SENT', 'DEAD']
+    ).update(status='SENDING', next_attempt_at=lease)
+    return list(EmailOutbox.objects.filter(id__in=ids, status='SENDING', next_attempt_at=lease))
+
+
+def _retry_later(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = 'DEAD'
+        logger.error(f"Email {email.id} dead-lettered after {email.attempts} attempts: {error}")
+    else:
+        email.status = 'PENDING'
+        delay = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def drain_outbox(batch_size=None):
+    """
+    Deliver due outbox messages over a single SMTP connection. Failures are
+    retried with exponential backoff and marked DEAD after
+    EMAIL_OUTBOX_MAX_ATTEMPTS. Returns the number of messages sent.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    sent = 0
+
+    while True:
+        batch = _claim_batch(batch_size)
+        if not batch:
+            break
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            for email in batch:
+                _retry_later(email, e)
+            break
+
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=email.recipients,
+                    connection=connection,
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as e:
+                    _retry_later(email, e)
+                    continue
+                email.status = 'SENT'
+                email.sent_at = timezone.now()
+                email.save(update_fields=['status', 'sent_at'])
+                sent += 1
+        finally:
+            connection.close()
+
+        if len(batch) < batch_size:
+            break
+
+    return sent
@@ -0,0 +1,167 @@
+from decimal import Decimal
+
+from django.conf import settings
+
+from .cache import get_cache
+
+cache = get_cache('entitlements')
+
+# Monthly limits per plan. None = Unlimited
+PLAN_LIMITS = {
+    "FREE": {
+        "applications": 20,
+        "chatbot": 0,
+        "resume": 0,
+        "consultant_sessions": 0,
+        "mock_interviews": 0,
+        "courses": 0,
+    },
+    "PRO": {
+        "applications": 100,
+        "chatbot": 250,
+        "resume": 3,
+        "consultant_sessions": 1,
+        "mock_interviews": 0,
+        "courses": 0,
+    },
+    "PROPLUS": {
+        "applications": None,
+        "chatbot": None,
+        "resume": 20,
+        "consultant_sessions": 4,
+        "mock_interviews": 4,
+        "courses": 1,
+    },
+}
+
+# Feature -> (UsageRecord field, short name used in quota_data template keys)
+FEATURES = {
+    "applications": ("applications", "applications"),
+    "chatbot": ("chatbot_queries", "chatbot"),
+    "resume": ("resume_optimizations", "resume"),
+    "consultant_sessions": ("consultant_sessions", "consultant"),
+    "mock_interviews": ("mock_interviews", "mock"),
+    "courses": ("courses_enrolled", "courses"),
+}
+
+
+def resolve_tier(profile):
+    if profile.is_proplus or (profile.is_trainee and profile.trainee_plan == 'proplus'):
+        return "PROPLUS"
+    elif profile.is_pro or (profile.is_trainee and profile.trainee_plan == 'pro'):
+        return "PRO"
+    return "FREE"
+
+
+class Entitlements:
+    """
+    Snapshot of a profile's plan limits and current-period usage. Every quota
+    check and quota dashboard reads from one of these instead of recomputing.
+    """
+
+    def __init__(self, tier, usage, consultant_hours=Decimal('0.00')):
+        self.tier = tier
+        self.limits = PLAN_LIMITS[tier]
+        self.usage = usage
+        self.consultant_hours = consultant_hours
+
+    @classmethod
+    def from_usage_record(cls, tier, record):
+        if record is None:
+            usage = {feature: 0 for feature in FEATURES}
+            return cls(tier, usage)
+        usage = {feature: getattr(record, field) for feature, (field, _) in FEATURES.items()}
+        return cls(tier, usage, record.consultant_hours)
+
+    def limit(self, feature):
+        return self.limits[feature]
+
+    def used(self, feature):
+        return self.usage[feature]
+
+    def remaining(self, feature):
+        limit = self.limit(feature)
+        if limit is None:
+            return None
+        return max(0, limit - self.used(feature))
+
+    def allows(self, feature):
+        limit = self.limit(feature)
+        return limit is None or self.used(feature) < limit
+
+    def percent(self, feature):
+        limit = self.limit(feature)
+        if limit is None:  # Unlimited
+            return 100
+        if limit == 0:
+            return 0
+        return min((self.used(feature) / limit) * 100, 100)
+
+    def quota_data(self):
+        data = {}
+        for feature, (_, name) in FEATURES.items():
+            data[f"{name}_used"] = self.used(feature)
+            data[f"{name}_limit"] = self.limit(feature)
+            data[f"{name}_percent"] = self.percent(feature)
+        return data
+
+    def to_cache(self):
+        return (self.tier, self.usage, self.consultant_hours)
+
+
+def _cache_key(user_id):
+    from .models import UsageRecord
+
+    return f"{user_id}:{UsageRecord.current_period()}"
+
+
+def get_entitlements(profile, request=None):
+    """
+    Resolve the entitlements snapshot for a profile once per request (memo on
+    the request) and otherwise from a short-lived cache that is cleared
+    whenever usage or plan changes.
+    """
+    memo = getattr(request, '_entitlements', None) if request is not None else None
+    if memo is not None and profile.pk in memo:
+        return memo[profile.pk]
+
+    key = _cache_key(profile.user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        entitlements = Entitlements(*cached)
+    else:
+        usage = profile.current_usage()
+        entitlements = Entitlements.from_usage_record(
+            resolve_tier(profile), usage if usage.pk else None
+        )
+        cache.set(key, entitlements.to_cache(), settings.ENTITLEMENTS_CACHE_TIMEOUT)
+
+    if request is not None:
+        if memo is None:
+            memo = request._entitlements = {}
+        memo[profile.pk] = entitlements
+    return entitlements
+
+
+def entitlements_for_profiles(profiles):
+    """
+    Snapshots for a list of profiles with a single UsageRecord query, for
+    dashboards that list many users at once.
+    """
+    from .models import UsageRecord
+
+    profiles = list(profiles)
+    records = {
+        record.profile_id: record
+        for record in UsageRecord.objects.filter(
+            profile__in=profiles, period=UsageRecord.current_period()
+        )
+    }
+    return {
+        profile.pk: Entitlements.from_usage_record(resolve_tier(profile), records.get(profile.pk))
+        for profile in profiles
+    }
+
+
+def invalidate_entitlements(user_id):
+    cache.delete(_cache_key(user_id))
@@ -1,12 +1,13 @@
 from django import forms
 from django.contrib.auth.models import User
 from .models import (Profile,JobApplication,Job,Appointment,
-                     InterviewSlot,MockInterviewFeedback,UserProgress,
+                     MockInterviewFeedback,UserProgress,
                      Enrollment,Course, ChatEscalation, Badge, AnnualReview)  # UPDATED: Added new models
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 import re
 from django.utils import timezone
+from .slots import free_slots
 
 class SignupForm(forms.ModelForm):
     password = forms.CharField(
@@ -123,9 +124,11 @@ class AppointmentForm(forms.ModelForm):
         if scheduled_at:
             if scheduled_at <= timezone.now():
                 raise ValidationError("Scheduled time must be in the future.")
-            # Check admin slots
-            slot, created = InterviewSlot.objects.get_or_create(date=scheduled_at.date())
-            if not slot.can_schedule():
+            # An appointment moved within its own day keeps the slot it holds.
+            stored = self.instance.scheduled_at if self.instance.pk else None
+            same_day = stored is not None and timezone.localtime(stored).date() == scheduled_at.date()
+            # Early feedback only; the booking itself reserves the slot atomically.
+            if not same_day and not free_slots(scheduled_at.date()):
                 raise ValidationError("No available slots for this date.")
         return scheduled_at
 
@@ -218,6 +221,16 @@ class BadgeForm(forms.ModelForm):
         model = Badge
         fields = ['name', 'description', 'criteria']
 
+    def clean_criteria(self):
+        from .badges import compile_criteria
+
+        criteria = self.cleaned_data.get('criteria')
+        try:
+            compile_criteria(criteria)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        return criteria
+
 class AnnualReviewForm(forms.ModelForm):
     class Meta:
         model = AnnualReview
@@ -0,0 +1,157 @@
+"""
+iCalendar (ICS) subscription feeds.
+
+Each user's feed covers the CalendarEvents they attend or consult on in a
+window around today. The body is streamed on the first request and cached
+under the user's schedule version, which is bumped whenever one of their
+CalendarEvents or Appointments changes, so polling calendar apps are
+answered from the cache (or with 304) until the schedule actually moves.
+"""
+import datetime
+import time
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import get_cache
+
+cache = get_cache('calendar')
+
+FEED_PAST_DAYS = 90
+FEED_FUTURE_DAYS = 365
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(user_id):
+    return f"version:{user_id}"
+
+
+def _body_key(user_id, version, day):
+    return f"feed:{user_id}:{version}:{day.isoformat()}"
+
+
+def schedule_version(user_id):
+    """Current schedule version of a user, started afresh if it is not cached."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # A time-based start can never match a body cached under an evicted version.
+        version = time.time_ns()
+        if not cache.add(key, version, FEED_CACHE_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_schedule(*user_ids):
+    """Invalidate the cached feeds of these users once the current transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+
+    def _bump():
+        for user_id in user_ids:
+            try:
+                cache.incr(_version_key(user_id))
+            except ValueError:
+                # No version cached: the next read starts a fresh one anyway.
+                pass
+
+    if user_ids:
+        transaction.on_commit(_bump)
+
+
+def feed_etag(user_id, version, day):
+    return f'"{user_id}-{version}-{day.isoformat()}"'
+
+
+def _escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Content line with CRLF, folded at 75 octets as RFC 5545 requires."""
+    if len(line.encode('utf-8')) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+
+def _utc(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _event(row):
+    pk, title, start, end, updated_at, appointment_type, status, video_link = row
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:calendar-event-{pk}@vcs",
+        f"DTSTAMP:{_utc(updated_at)}",
+        f"LAST-MODIFIED:{_utc(updated_at)}",
+        f"DTSTART:{_utc(start)}",
+        f"DTEND:{_utc(end)}",
+        f"SUMMARY:{_escape(title)}",
+    ]
+    if appointment_type:
+        lines.append(f"DESCRIPTION:{_escape(appointment_type.replace('_', ' ').title())} ({_escape(status.title())})")
+    if video_link:
+        lines.append(f"LOCATION:{_escape(video_link)}")
+        lines.append(f"URL:{video_link}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def _render(user_id, calendar_name, day):
+    from .models import CalendarEvent
+
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min)) - datetime.timedelta(days=FEED_PAST_DAYS)
+    end = start + datetime.timedelta(days=FEED_PAST_DAYS + FEED_FUTURE_DAYS)
+    rows = CalendarEvent.objects.filter(
+        Q(user_id=user_id) | Q(related_appointment__consultant_id=user_id),
+        start_time__lt=end,
+        end_time__gt=start,
+    ).order_by('start_time', 'id').values_list(
+        'id', 'title', 'start_time', 'end_time', 'updated_at',
+        'related_appointment__appointment_type', 'related_appointment__status',
+        'related_appointment__video_link',
+    )
+
+    yield "".join(_fold(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//VCS//Schedule//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(calendar_name)}",
+    ])
+    for row in rows.iterator(chunk_size=500):
+        yield _event(row)
+    yield _fold("END:VCALENDAR")
+
+
+def feed_chunks(user_id, calendar_name, version, day):
+    """
+    ICS body of a user's feed as a stream of chunks: the cached body if this
+    schedule version was already rendered today, otherwise rendered row by
+    row and cached once complete.
+    """
+    key = _body_key(user_id, version, day)
+    body = cache.get(key)
+    if body is not None:
+        yield body
+        return
+
+    parts = []
+    for chunk in _render(user_id, calendar_name, day):
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, "".join(parts), FEED_CACHE_TIMEOUT)
@@ -0,0 +1,112 @@
+"""
+Local keyword-gap analysis for the resume optimizer.
+
+The keywords of a role are mined from the descriptions of our own Job rows
+with that title, weighted by how many of those jobs mention them. A resume
+is scored by the weighted share of role keywords it contains; matching is a
+single vectorized numpy membership test over the whole resume.
+"""
+import hashlib
+import re
+
+import numpy as np
+from django.db.models import Q
+
+from .cache import get_cache
+from .models import Job
+
+cache = get_cache('resume_ai')
+
+KEYWORD_LIMIT = 25
+KEYWORDS_CACHE_TIMEOUT = 60 * 60
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can
+could did do does during each either etc for from had has have having he her here his
+how i if in including into is it its just like may me more most must my no not of on
+one only or other our out over own per please plus same she should so some such than
+that the their them then there these they this those through to too under until up
+upon us very via was we were what when where which while who whom why will with within
+without would you your yours
+
+ability able apply applicant applicants based best candidate candidates company
+description duties eligibility eligible environment excellent experience experienced
+good great help ideal job join knowledge looking need needed new opportunity position preferred
+required requirement requirements responsibilities responsible role salary skill skills
+strong team understanding work working year years
+""".split())
+
+
+def tokenize(text):
+    """Lower-cased word tokens without stop words; keeps c++, c#, node.js, ci-cd."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def _role_jobs(job_title):
+    jobs = Job.objects.filter(job_title__icontains=job_title)
+    if jobs.exists():
+        return jobs
+    words = [w for w in tokenize(job_title) if len(w) > 2]
+    if not words:
+        return Job.objects.none()
+    q = Q()
+    for word in words:
+        q |= Q(job_title__icontains=word)
+    return Job.objects.filter(q)
+
+
+def _extract_role_keywords(job_title, limit):
+    documents = [
+        set(tokenize(f"{description} {eligibility}"))
+        for description, eligibility in _role_jobs(job_title).values_list(
+            'job_description', 'eligibility'
+        )[:200]
+    ]
+    if not documents:
+        # No such role on our board: the title's own words are all we have.
+        title_tokens = list(dict.fromkeys(tokenize(job_title)))
+        return title_tokens, [1.0] * len(title_tokens)
+
+    # Document frequency: the share of matching jobs that mention a token.
+    tokens, counts = np.unique(
+        np.array([t for doc in documents for t in doc], dtype=str), return_counts=True
+    )
+    weights = counts / len(documents)
+    order = np.argsort(-weights, kind='stable')[:limit]
+    return tokens[order].tolist(), weights[order].tolist()
+
+
+def role_keywords(job_title, limit=KEYWORD_LIMIT):
+    """(keywords, weights) for a job title, cached for KEYWORDS_CACHE_TIMEOUT."""
+    title = " ".join(job_title.split()).casefold()
+    key = f"keywords:{limit}:{hashlib.sha256(title.encode('utf-8')).hexdigest()}"
+    found = cache.get(key)
+    if found is None:
+        found = _extract_role_keywords(title, limit)
+        cache.set(key, found, KEYWORDS_CACHE_TIMEOUT)
+    return found
+
+
+def analyze_keywords(job_title, resume_text):
+    """
+    Score the whole resume against the role's keywords. Returns a dict with
+    score (0-100), matched_keywords and missing_keywords, both ordered by
+    importance to the role.
+    """
+    keywords, weights = role_keywords(job_title)
+    if not keywords:
+        return {'score': 0, 'matched_keywords': [], 'missing_keywords': []}
+
+    keywords = np.array(keywords, dtype=str)
+    weights = np.array(weights, dtype=float)
+    resume_tokens = np.unique(np.array(tokenize(resume_text), dtype=str))
+    matched = np.isin(keywords, resume_tokens)
+
+    score = int(round(weights[matched].sum() / weights.sum() * 100))
+    return {
+        'score': score,
+        'matched_keywords': keywords[matched].tolist(),
+        'missing_keywords': keywords[~matched].tolist(),
+    }
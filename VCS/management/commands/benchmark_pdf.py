@@ -0,0 +1,72 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from VCS import pdf
+from VCS.models import Certificate, Course, Enrollment, Invoice, Profile, Subscription
+
+
+def _reset_caches():
+    pdf.get_styles.cache_clear()
+    pdf.get_logo.cache_clear()
+    pdf._local.__dict__.pop('page_templates', None)
+
+
+def _sample_documents():
+    """Unsaved model instances, so the benchmark never touches the database."""
+    user = User(username='benchmark', email='benchmark@example.com', first_name='Bench', last_name='Mark')
+    subscription = Subscription(
+        user=user, plan_name='Pro', billing_cycle='monthly',
+        end_date=timezone.now().date() + timedelta(days=30),
+    )
+    invoice = Invoice(
+        user=user, subscription=subscription, invoice_number='INV-BENCHMARK',
+        amount=Decimal('999.00'), date=timezone.now(), paid=True,
+    )
+    enrollment = Enrollment(profile=Profile(user=user), course=Course(title='Data Analytics Bootcamp'))
+    certificate = Certificate(enrollment=enrollment, issued_at=timezone.now())
+    resume = "Backend developer with 4 years of Python and Django.\n" * 20
+    suggestions = ["Add cloud experience.", "Highlight projects.", "Quantify impact."]
+
+    return {
+        'invoice': lambda: pdf.build_invoice_pdf(invoice),
+        'resume_report': lambda: pdf.build_resume_report_pdf('Backend Engineer', resume, suggestions),
+        'certificate': lambda: pdf.build_certificate_pdf(certificate),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-document PDF render time of the current builders with cold and "
+        "with warm style/template caches. Both runs use the same code, so the ratio "
+        "is the gain from caching alone, not a comparison with an earlier implementation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        for name, render in _sample_documents().items():
+            cold = self._time(render, iterations, reset=True)
+            warm = self._time(render, iterations, reset=False)
+            self.stdout.write(
+                f"{name:<14} cold {cold * 1000:7.2f} ms/doc   warm {warm * 1000:7.2f} ms/doc   "
+                f"cache gain {cold / warm if warm else 0:.2f}x"
+            )
+
+    def _time(self, render, iterations, reset):
+        render()  # import and font warm-up outside the measurement
+        total = 0.0
+        for _ in range(iterations):
+            if reset:
+                _reset_caches()
+            started = time.perf_counter()
+            render()
+            total += time.perf_counter() - started
+        return total / iterations
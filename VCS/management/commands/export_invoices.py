@@ -0,0 +1,143 @@
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import django
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from VCS.models import Invoice
+
+CHUNK_SIZE = 64 * 1024
+PROGRESS_EVERY = 25
+
+
+def _init_worker():
+    # Forked workers must not share the parent's database sockets; spawned
+    # ones need Django set up before they can import models.
+    django.setup()
+    connections.close_all()
+
+
+def _render_in_worker(invoice_id):
+    from VCS.pdf import render_invoice
+
+    invoice = Invoice.objects.select_related('user', 'subscription').get(pk=invoice_id)
+    render_invoice(invoice)
+    return invoice.pk, invoice.file.name
+
+
+def _parse_date(value):
+    try:
+        return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Export the invoices of a date range as PDFs in a single ZIP, rendering missing PDFs in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Month to export, YYYY-MM (shortcut for --start/--end)")
+        parser.add_argument('--start', help="First day to include, YYYY-MM-DD")
+        parser.add_argument('--end', help="First day to exclude, YYYY-MM-DD")
+        parser.add_argument('--output', help="ZIP file to write (default invoices-<start>-<end>.zip)")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--regenerate', action='store_true', help="Re-render PDFs that already exist")
+
+    def handle(self, *args, **options):
+        start, end = self._date_range(options)
+        output = options['output'] or f"invoices-{start:%Y%m%d}-{end:%Y%m%d}.zip"
+
+        invoices = Invoice.objects.filter(date__gte=start, date__lt=end).order_by('date', 'pk')
+        total = invoices.count()
+        if not total:
+            self.stdout.write("No invoices in range.")
+            return
+
+        if options['regenerate']:
+            missing = list(invoices.values_list('pk', flat=True))
+        else:
+            missing = list(
+                invoices.exclude(render_status='READY', file__gt='').values_list('pk', flat=True)
+            )
+        ready = invoices.exclude(pk__in=missing).values_list('pk', 'invoice_number', 'file')
+
+        self.stdout.write(
+            f"Exporting {total} invoices ({len(missing)} to render with {options['workers']} workers) to {output}"
+        )
+        self.started = time.perf_counter()
+        self.done, self.failed, self.bytes = 0, 0, 0
+        self.total = total
+
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as zf:
+            if missing:
+                # Fork after closing our connections so children open their own.
+                connections.close_all()
+                with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+                    futures = {pool.submit(_render_in_worker, pk): pk for pk in missing}
+                    # Archive the PDFs that already exist while the workers render.
+                    for pk, number, name in ready.iterator():
+                        self._add(zf, number, name)
+                    numbers = dict(Invoice.objects.filter(pk__in=missing).values_list('pk', 'invoice_number'))
+                    for future in as_completed(futures):
+                        pk = futures[future]
+                        try:
+                            _, name = future.result()
+                        except Exception as e:
+                            self.failed += 1
+                            self.stderr.write(f"\nFailed to render invoice {pk}: {e}")
+                            continue
+                        self._add(zf, numbers[pk], name)
+            else:
+                for pk, number, name in ready.iterator():
+                    self._add(zf, number, name)
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {self.done} invoices ({self.bytes / 1024 / 1024:.1f} MB) in {elapsed:.1f}s, "
+            f"{self.done / elapsed if elapsed else 0:.1f} invoices/s, {self.failed} failed"
+        ))
+
+    def _date_range(self, options):
+        if options['month']:
+            try:
+                start = timezone.make_aware(datetime.strptime(options['month'], '%Y-%m'))
+            except ValueError:
+                raise CommandError(f"Invalid month {options['month']!r}, expected YYYY-MM")
+            end = (start + timedelta(days=32)).replace(day=1)
+            return start, end
+        if not (options['start'] and options['end']):
+            raise CommandError("Pass --month or both --start and --end")
+        start, end = _parse_date(options['start']), _parse_date(options['end'])
+        if end <= start:
+            raise CommandError("--end must be after --start")
+        return start, end
+
+    def _add(self, zf, invoice_number, file_name):
+        """Copy one stored PDF into the archive in chunks, skipping it if the file is gone."""
+        try:
+            # Opened before the archive entry so a missing file leaves no empty member.
+            src = default_storage.open(file_name, 'rb')
+        except OSError as e:
+            self.failed += 1
+            self.stderr.write(f"\nMissing PDF for invoice {invoice_number} ({file_name}): {e}")
+            return
+        with src, zf.open(f"{invoice_number}.pdf", 'w') as dst:
+            while chunk := src.read(CHUNK_SIZE):
+                dst.write(chunk)
+                self.bytes += len(chunk)
+        self.done += 1
+        if self.done % PROGRESS_EVERY and self.done + self.failed != self.total:
+            return
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            f"\r{self.done}/{self.total} invoices, {self.done / elapsed if elapsed else 0:.1f}/s",
+            ending='',
+        )
+        self.stdout.flush()
@@ -1,6 +1,8 @@
 import time
 from django.http import JsonResponse
-from django.core.cache import cache
+from .cache import get_cache
+
+cache = get_cache('ratelimit')
 
 class RateLimitMiddleware:
     def __init__(self, get_response):
@@ -17,7 +19,7 @@ class RateLimitMiddleware:
         for path, config in limits.items():
             if path in request.path:  # Simple path match; use regex for dynamic paths
                 ip = request.META.get('REMOTE_ADDR')
-                key = f"ratelimit:{ip}:{path}"
+                key = f"{ip}:{path}"
                 requests = cache.get(key, [])
                 now = time.time()
                 # Filter requests within the window
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:43
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_unread_notifications(apps, schema_editor):
+    Profile = apps.get_model('VCS', 'Profile')
+    User = apps.get_model('auth', 'User')
+    unread = User.objects.annotate(
+        unread=Count('notification', filter=Q(notification__is_read=False))
+    ).filter(unread__gt=0).values_list('id', 'unread')
+    for user_id, count in unread:
+        Profile.objects.filter(user_id=user_id).update(unread_notifications=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0023_profile_course_profile_is_trainee_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0024_profile_unread_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='VCS_notific_user_id_10edfa_idx'),
+        ),
+    ]
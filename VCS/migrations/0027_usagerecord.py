@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def backfill_current_period(apps, schema_editor):
+    Profile = apps.get_model('VCS', 'Profile')
+    UsageRecord = apps.get_model('VCS', 'UsageRecord')
+    now = timezone.now()
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    counts = Profile.objects.filter(
+        user__jobapplication__applied_at__gte=start
+    ).annotate(applications=Count('user__jobapplication')).values_list('id', 'applications')
+    UsageRecord.objects.bulk_create([
+        UsageRecord(profile_id=profile_id, period=now.strftime('%Y-%m'), applications=applications)
+        for profile_id, applications in counts
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0026_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=7)),
+                ('applications', models.PositiveIntegerField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_records', to='VCS.profile')),
+            ],
+            options={
+                'unique_together': {('profile', 'period')},
+            },
+        ),
+        migrations.RunPython(backfill_current_period, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:05
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.utils import timezone
+
+
+COUNTERS = {
+    'chatbot_queries_this_month': 'chatbot_queries',
+    'resume_optimizations_this_month': 'resume_optimizations',
+    'consultant_sessions_this_month': 'consultant_sessions',
+    'mock_interviews_this_month': 'mock_interviews',
+    'courses_enrolled_this_month': 'courses_enrolled',
+    'consultant_hours_used_this_month': 'consultant_hours',
+}
+
+
+def move_counters_to_current_period(apps, schema_editor):
+    Profile = apps.get_model('VCS', 'Profile')
+    UsageRecord = apps.get_model('VCS', 'UsageRecord')
+    period = timezone.now().strftime('%Y-%m')
+    for row in Profile.objects.values('id', *COUNTERS):
+        values = {COUNTERS[name]: row[name] for name in COUNTERS}
+        if not any(values.values()):
+            continue
+        UsageRecord.objects.update_or_create(profile_id=row['id'], period=period, defaults=values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0027_usagerecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usagerecord',
+            name='chatbot_queries',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usagerecord',
+            name='consultant_hours',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='usagerecord',
+            name='consultant_sessions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usagerecord',
+            name='courses_enrolled',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usagerecord',
+            name='mock_interviews',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usagerecord',
+            name='resume_optimizations',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(move_counters_to_current_period, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='profile',
+            name='chatbot_queries_this_month',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='consultant_hours_used_this_month',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='consultant_sessions_this_month',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='courses_enrolled_this_month',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='mock_interviews_this_month',
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='resume_optimizations_this_month',
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:51
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def dedupe_user_badges(apps, schema_editor):
+    UserBadge = apps.get_model('VCS', 'UserBadge')
+    duplicates = UserBadge.objects.values('user', 'badge').annotate(
+        keep=Min('id'), n=Count('id')
+    ).filter(n__gt=1)
+    for row in duplicates:
+        UserBadge.objects.filter(user=row['user'], badge=row['badge']).exclude(
+            id=row['keep']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0028_usage_counters_per_period'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_user_badges, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='userbadge',
+            unique_together={('user', 'badge')},
+        ),
+    ]
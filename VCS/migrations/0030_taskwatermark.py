@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0029_userbadge_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
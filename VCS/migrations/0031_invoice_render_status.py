@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:55
+
+from django.db import migrations, models
+
+
+def mark_rendered_invoices(apps, schema_editor):
+    Invoice = apps.get_model('VCS', 'Invoice')
+    Invoice.objects.exclude(file='').exclude(file__isnull=True).update(render_status='READY')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0030_taskwatermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='render_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RENDERING', 'Rendering'), ('READY', 'Ready'), ('FAILED', 'Failed')], default='PENDING', max_length=10),
+        ),
+        migrations.RunPython(mark_rendered_invoices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0031_invoice_render_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('job_title', models.CharField(max_length=255)),
+                ('resume_text', models.TextField()),
+                ('suggestions', models.JSONField(default=list)),
+                ('file', models.FileField(blank=True, null=True, upload_to='resume_reports/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
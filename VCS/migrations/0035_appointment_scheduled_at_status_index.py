@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0034_resumetext'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['scheduled_at', 'status'], name='VCS_appoint_schedul_d39d00_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0035_appointment_scheduled_at_status_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calendarevent',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='calendarevent',
+            index=models.Index(fields=['start_time', 'end_time'], name='VCS_calenda_start_t_14be58_idx'),
+        ),
+    ]
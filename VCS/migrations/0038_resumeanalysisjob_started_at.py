@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VCS', '0037_calendarfeed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysisjob',
+            name='quota_reserved',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysisjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
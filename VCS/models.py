@@ -1,9 +1,12 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
 from decimal import Decimal
+import secrets
 import uuid
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, F
+from .entitlements import FEATURES, PLAN_LIMITS, resolve_tier, get_entitlements, invalidate_entitlements
+from .slots import invalidate_availability
 
 # Create your models here.
 
@@ -66,10 +69,18 @@ class JobApplication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='APPLIED')
     updated_at = models.DateTimeField(auto_now=True)
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    # sha256 of the resume file, set by the indexing task; see ResumeText
+    resume_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
 
     class Meta:
         unique_together = ('user', 'job')
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            UsageRecord.increment(self.user_id, 'applications')
+
     def __str__(self):
         return f"{self.user.username} - {self.job.job_title} ({self.status})"
 
@@ -106,24 +117,17 @@ class Profile(models.Model):
     experience = models.CharField(max_length=100)
     skills = models.TextField()
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
 
     is_pro = models.BooleanField(default=False)
     is_proplus = models.BooleanField(default=False)
 
-    resume_optimizations_this_month = models.PositiveIntegerField(default=0)
-    chatbot_queries_this_month = models.PositiveIntegerField(default=0)
-    consultant_sessions_this_month = models.PositiveIntegerField(default=0)
-    mock_interviews_this_month = models.PositiveIntegerField(default=0)
-    courses_enrolled_this_month = models.PositiveIntegerField(default=0)
+    unread_notifications = models.PositiveIntegerField(default=0)
 
     is_trainee = models.BooleanField(default=False) 
     course = models.CharField(max_length=100, blank=True, null=True) 
     trainee_plan = models.CharField(max_length=10, choices=[('pro', 'Pro'), ('proplus', 'Pro Plus')], default='pro') 
 
-    consultant_hours_used_this_month = models.DecimalField(
-        max_digits=5, decimal_places=2, default=0.0
-    )
-
     enrolled_courses = models.ManyToManyField(
         'Course', through='Enrollment', related_name='enrolled_users'
     )
@@ -143,65 +147,80 @@ class Profile(models.Model):
 
     @property
     def tier(self):
-        if self.is_proplus or (self.is_trainee and self.trainee_plan == 'proplus'):
-            return "PROPLUS"
-        elif self.is_pro or (self.is_trainee and self.trainee_plan == 'pro'):
-            return "PRO"
-        return "FREE"
+        return resolve_tier(self)
 
     def get_limits(self):
         """
         Returns all limits based on subscription tier or trainee plan.
         None = Unlimited
         """
-        limits = {
-            "FREE": {
-                "applications": 20,
-                "chatbot": 0,
-                "resume": 0,
-                "consultant_sessions": 0,
-                "mock_interviews": 0,
-                "courses": 0,
-            },
-            "PRO": {
-                "applications": 100,
-                "chatbot": 250,
-                "resume": 3,
-                "consultant_sessions": 1,
-                "mock_interviews": 0,
-                "courses": 0,
-            },
-            "PROPLUS": {
-                "applications": None,   
-                "chatbot": None,      
-                "resume": 20,
-                "consultant_sessions": 4,
-                "mock_interviews": 4,
-                "courses": 1,
-            }
-        }
+        return PLAN_LIMITS[self.tier]
 
-        # UPDATED: Check for trainee first
-        if self.is_trainee:
-            if self.trainee_plan == 'proplus':
-                return limits["PROPLUS"]
-            else:
-                return limits["PRO"]
-        
-        return limits[self.tier]
+    def entitlements(self, request=None):
+        """Plan limits and current usage, resolved once per request."""
+        if request is not None:
+            return get_entitlements(self, request)
+        if getattr(self, '_entitlements', None) is None:
+            self._entitlements = get_entitlements(self)
+        return self._entitlements
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._entitlements = None
+        invalidate_entitlements(self.user_id)
+
+    # Monthly counters live on UsageRecord, one row per billing period. A
+    # period without a row has not been used yet, so counters "reset" the
+    # first time they are read in a new month without any bulk UPDATE.
+    USAGE_FIELDS = {
+        'applications_this_month': 'applications',
+        'chatbot_queries_this_month': 'chatbot_queries',
+        'resume_optimizations_this_month': 'resume_optimizations',
+        'consultant_sessions_this_month': 'consultant_sessions',
+        'mock_interviews_this_month': 'mock_interviews',
+        'courses_enrolled_this_month': 'courses_enrolled',
+        'consultant_hours_used_this_month': 'consultant_hours',
+    }
+
+    def current_usage(self):
+        period = UsageRecord.current_period()
+        usage = getattr(self, '_current_usage', None)
+        if usage is None or usage.period != period:
+            usage = UsageRecord.objects.filter(profile=self, period=period).first()
+            if usage is None:
+                usage = UsageRecord(profile=self, period=period)
+            self._current_usage = usage
+        return usage
 
     def applications_this_month(self):
-        now = timezone.now()
-        return self.user.jobapplication_set.filter(
-            applied_at__year=now.year,
-            applied_at__month=now.month
-        ).count()
+        return self.current_usage().applications
+
+    @property
+    def chatbot_queries_this_month(self):
+        return self.current_usage().chatbot_queries
+
+    @property
+    def resume_optimizations_this_month(self):
+        return self.current_usage().resume_optimizations
+
+    @property
+    def consultant_sessions_this_month(self):
+        return self.current_usage().consultant_sessions
+
+    @property
+    def mock_interviews_this_month(self):
+        return self.current_usage().mock_interviews
+
+    @property
+    def courses_enrolled_this_month(self):
+        return self.current_usage().courses_enrolled
+
+    @property
+    def consultant_hours_used_this_month(self):
+        return self.current_usage().consultant_hours
 
     def can_apply(self):
-        limit = self.get_limits()["applications"]
-        if limit is None:
-            return True
-        return self.applications_this_month() < limit
+        return self.entitlements().allows("applications")
 
     def check_quota(self, feature_name, used_value):
         """
@@ -216,43 +235,61 @@ class Profile(models.Model):
         return used_value < limit
 
     def can_use_chatbot(self):
-        # UPDATED: For trainees, use trainee_plan logic
-        if self.is_trainee:
-            if self.trainee_plan == 'proplus':
-                return True
-            return self.chatbot_queries_this_month < 250
-        return self.check_quota("chatbot", self.chatbot_queries_this_month)
+        return self.entitlements().allows("chatbot")
 
     def can_optimize_resume(self):
-        return self.check_quota("resume", self.resume_optimizations_this_month)
+        return self.entitlements().allows("resume")
 
     def can_schedule_session(self):
-        return self.check_quota("consultant_sessions", self.consultant_sessions_this_month)
+        return self.entitlements().allows("consultant_sessions")
 
     def can_schedule_mock_interview(self):
-        return self.check_quota("mock_interviews", self.mock_interviews_this_month)
+        return self.entitlements().allows("mock_interviews")
 
     def can_enroll_course(self):
-        return self.check_quota("courses", self.courses_enrolled_this_month)
+        return self.entitlements().allows("courses")
+
+    def mock_interviews_remaining(self):
+        return self.entitlements().remaining("mock_interviews")
 
     def increment_chatbot_queries(self):
         """Increment the chatbot queries counter."""
-        self.chatbot_queries_this_month += 1
-        self.save()
+        self.increment_usage("chatbot_queries_this_month")
 
-    def increment_usage(self, field_name):
+    def increment_mock_interviews(self):
+        self.increment_usage("mock_interviews_this_month")
+
+    def decrement_mock_interviews(self):
+        self.decrement_usage("mock_interviews_this_month")
+
+    def increment_usage(self, field_name, amount=1):
         """
-        Generic increment method.
+        Generic increment method for the current billing period.
         Example: self.increment_usage("chatbot_queries_this_month")
         """
-        setattr(self, field_name, getattr(self, field_name) + 1)
-        self.save(update_fields=[field_name])
+        UsageRecord.increment(self.user_id, self.USAGE_FIELDS[field_name], amount)
+        self._current_usage = None
+        self._entitlements = None
+
+    def decrement_usage(self, field_name, amount=1):
+        UsageRecord.decrement(self.user_id, self.USAGE_FIELDS[field_name], amount)
+        self._current_usage = None
+        self._entitlements = None
+
+    def reserve_usage(self, feature):
+        """
+        Count one use of an entitlements feature unless its plan limit is
+        already reached, in a single conditional UPDATE. Returns False if it is.
+        """
+        reserved = UsageRecord.reserve(self.user_id, FEATURES[feature][0], self.entitlements().limit(feature))
+        self._current_usage = None
+        self._entitlements = None
+        return reserved
 
     def award_badges(self):
-        badges = Badge.objects.all()
-        for badge in badges:
-            if eval(badge.criteria):
-                UserBadge.objects.get_or_create(user=self.user, badge=badge)
+        from .badges import award_badges
+
+        return award_badges(User.objects.filter(pk=self.user_id))
 
     @staticmethod
     def proplus_subscriber_count():
@@ -270,6 +307,83 @@ class Profile(models.Model):
         return self.user.username
 
 
+class UsageRecord(models.Model):
+    """
+    Usage counters of one profile for one billing period (e.g. "2026-10").
+    A new period simply starts a new row, so quota checks are a single
+    unique-key lookup.
+    """
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='usage_records')
+    period = models.CharField(max_length=7)
+    applications = models.PositiveIntegerField(default=0)
+    chatbot_queries = models.PositiveIntegerField(default=0)
+    resume_optimizations = models.PositiveIntegerField(default=0)
+    consultant_sessions = models.PositiveIntegerField(default=0)
+    mock_interviews = models.PositiveIntegerField(default=0)
+    courses_enrolled = models.PositiveIntegerField(default=0)
+    consultant_hours = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        unique_together = ('profile', 'period')
+
+    @staticmethod
+    def current_period():
+        return timezone.now().strftime('%Y-%m')
+
+    @classmethod
+    def increment(cls, user_id, field_name, amount=1):
+        """Atomically add `amount` to a counter of the user's current-period record."""
+        period = cls.current_period()
+        updated = cls.objects.filter(profile__user_id=user_id, period=period).update(
+            **{field_name: F(field_name) + amount}
+        )
+        if not updated:
+            profile_id = Profile.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+            if profile_id is not None:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(profile_id=profile_id, period=period, **{field_name: amount})
+                except IntegrityError:
+                    cls.objects.filter(profile_id=profile_id, period=period).update(
+                        **{field_name: F(field_name) + amount}
+                    )
+        invalidate_entitlements(user_id)
+
+    @classmethod
+    def reserve(cls, user_id, field_name, limit):
+        """
+        Add one to a counter of the user's current-period record unless it
+        already reached `limit` (None for unlimited). Returns False if it did.
+        """
+        if limit is None:
+            cls.increment(user_id, field_name)
+            return True
+        profile_id = Profile.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+        if profile_id is None:
+            return False
+        period = cls.current_period()
+        cls.objects.get_or_create(profile_id=profile_id, period=period)
+        reserved = bool(
+            cls.objects.filter(profile_id=profile_id, period=period, **{f"{field_name}__lt": limit})
+            .update(**{field_name: F(field_name) + 1})
+        )
+        if reserved:
+            invalidate_entitlements(user_id)
+        return reserved
+
+    @classmethod
+    def decrement(cls, user_id, field_name, amount=1):
+        cls.objects.filter(
+            profile__user_id=user_id,
+            period=cls.current_period(),
+            **{f"{field_name}__gte": amount}
+        ).update(**{field_name: F(field_name) - amount})
+        invalidate_entitlements(user_id)
+
+    def __str__(self):
+        return f"{self.profile} - {self.period}"
+
+
 class Enrollment(models.Model):
     STAGE_CHOICES = [
         ('ENROLLED', 'Enrolled'),
@@ -331,15 +445,40 @@ class InterviewSlot(models.Model):
     def can_schedule(self):
         return self.available_slots() > 0
 
+    @classmethod
+    def reserve(cls, date):
+        """
+        Take one slot on `date` with a single conditional UPDATE. Returns False
+        if the date is full. Call it in the same transaction as the booking so
+        a failed booking gives the slot back.
+        """
+        cls.objects.get_or_create(date=date)
+        reserved = bool(
+            cls.objects.filter(date=date, used_slots__lt=F('max_slots'))
+            .update(used_slots=F('used_slots') + 1)
+        )
+        if reserved:
+            invalidate_availability(date)
+        return reserved
+
+    @classmethod
+    def release(cls, date):
+        """Give back one slot on `date`; returns False if none was in use."""
+        released = bool(
+            cls.objects.filter(date=date, used_slots__gt=0)
+            .update(used_slots=F('used_slots') - 1)
+        )
+        if released:
+            invalidate_availability(date)
+        return released
+
     def increment_slots(self):
-        if self.can_schedule():
-            self.used_slots += 1
-            self.save()
+        if InterviewSlot.reserve(self.date):
+            self.refresh_from_db(fields=['used_slots'])
 
     def decrement_slots(self):
-        if self.used_slots > 0:
-            self.used_slots -= 1
-            self.save()
+        if InterviewSlot.release(self.date):
+            self.refresh_from_db(fields=['used_slots'])
 
 class Subscription(models.Model):
     PLAN_CHOICES = (
@@ -382,6 +521,13 @@ class Subscription(models.Model):
         return Decimal("0.00")
 
 class Invoice(models.Model):
+    RENDER_STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RENDERING', 'Rendering'),
+        ('READY', 'Ready'),
+        ('FAILED', 'Failed'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     subscription = models.ForeignKey(Subscription, on_delete=models.CASCADE)
     invoice_number = models.CharField(max_length=50, unique=True, editable=False)
@@ -389,6 +535,7 @@ class Invoice(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     paid = models.BooleanField(default=False)
     file = models.FileField(upload_to="invoices/", null=True, blank=True)
+    render_status = models.CharField(max_length=10, choices=RENDER_STATUS_CHOICES, default='PENDING')
 
     def save(self, *args, **kwargs):
         if not self.invoice_number:
@@ -440,6 +587,29 @@ class Appointment(models.Model):
     sla_due = models.DateTimeField(null=True, blank=True)
     sla_complied = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['scheduled_at', 'status']),
+        ]
+
+    def _schedule_owner_ids(self):
+        candidate_id = JobApplication.objects.filter(pk=self.application_id).values_list('user_id', flat=True).first()
+        return [candidate_id, self.consultant_id]
+
+    def save(self, *args, **kwargs):
+        from .ics import bump_schedule
+
+        super().save(*args, **kwargs)
+        bump_schedule(*self._schedule_owner_ids())
+
+    def delete(self, *args, **kwargs):
+        from .ics import bump_schedule
+
+        owner_ids = self._schedule_owner_ids()
+        result = super().delete(*args, **kwargs)
+        bump_schedule(*owner_ids)
+        return result
+
     def set_sla(self):
         if self.appointment_type == 'ONE_ON_ONE':
             hours = 2 if self.application.user.profile.is_proplus else 4
@@ -459,6 +629,9 @@ class MockInterviewFeedback(models.Model):
     def __str__(self):
         return f"Feedback for {self.appointment}"
 
+def new_feed_token():
+    return secrets.token_urlsafe(32)
+
 class CalendarEvent(models.Model):
     title = models.CharField(max_length=255)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -470,10 +643,55 @@ class CalendarEvent(models.Model):
         null=True,
         blank=True
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_time', 'end_time']),
+        ]
+
+    def _schedule_owner_ids(self):
+        consultant_id = Appointment.objects.filter(pk=self.related_appointment_id).values_list(
+            'consultant_id', flat=True
+        ).first()
+        return [self.user_id, consultant_id]
+
+    def save(self, *args, **kwargs):
+        from .ics import bump_schedule
+
+        super().save(*args, **kwargs)
+        bump_schedule(*self._schedule_owner_ids())
+
+    def delete(self, *args, **kwargs):
+        from .ics import bump_schedule
+
+        owner_ids = self._schedule_owner_ids()
+        result = super().delete(*args, **kwargs)
+        bump_schedule(*owner_ids)
+        return result
 
     def __str__(self):
         return self.title
 
+class CalendarFeed(models.Model):
+    """Secret per-user token for subscribing to the schedule from a calendar app."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_feed')
+    token = models.CharField(max_length=64, unique=True, default=new_feed_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def for_user(cls, user):
+        feed, _ = cls.objects.get_or_create(user=user)
+        return feed
+
+    def rotate(self):
+        """Replace the token so previously shared feed URLs stop working."""
+        self.token = new_feed_token()
+        self.save(update_fields=['token'])
+
+    def __str__(self):
+        return f"Calendar feed for {self.user}"
+
 class Interaction(models.Model):
     application = models.ForeignKey(JobApplication, on_delete=models.CASCADE)
     admin = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -505,9 +723,154 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at']),
+        ]
+
+    def _adjust_unread(self, delta):
+        from .notifications import invalidate_user_cache
+
+        profiles = Profile.objects.filter(user_id=self.user_id)
+        if delta < 0:
+            profiles = profiles.filter(unread_notifications__gt=0)
+        profiles.update(unread_notifications=F('unread_notifications') + delta)
+        invalidate_user_cache(self.user_id)
+
+    def save(self, *args, **kwargs):
+        # Keep Profile.unread_notifications in step with creates and with
+        # is_read changes made through save() (views, admin forms).
+        adding = self._state.adding
+        was_read = None
+        if not adding and self.pk:
+            was_read = Notification.objects.filter(pk=self.pk).values_list('is_read', flat=True).first()
+        super().save(*args, **kwargs)
+        if adding or was_read is None:
+            if not self.is_read:
+                self._adjust_unread(1)
+        elif was_read != self.is_read:
+            self._adjust_unread(-1 if self.is_read else 1)
+
+    def delete(self, *args, **kwargs):
+        was_unread = Notification.objects.filter(pk=self.pk, is_read=False).exists()
+        result = super().delete(*args, **kwargs)
+        if was_unread:
+            self._adjust_unread(-1)
+        return result
+
     def __str__(self):
         return self.message
 
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('DEAD', 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+class ResumeText(models.Model):
+    """
+    Text extracted once from an uploaded resume file, keyed by the file's
+    sha256 so the same file attached to several applications is only parsed
+    once.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    text = models.TextField(blank=True)
+    tokens = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    extracted_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.status})"
+
+class ResumeReport(models.Model):
+    """
+    Enhanced resume report for one (job title, resume) content hash. The PDF
+    is rendered on first download and then reused.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    job_title = models.CharField(max_length=255)
+    resume_text = models.TextField()
+    suggestions = models.JSONField(default=list)
+    file = models.FileField(upload_to='resume_reports/', null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Resume report for {self.job_title} ({self.content_hash[:10]})"
+
+class ResumeAnalysisJob(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resume_analysis_jobs')
+    job_title = models.CharField(max_length=255)
+    resume_text = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    result = models.JSONField(null=True, blank=True)
+    from_cache = models.BooleanField(default=False)
+    # Whether a resume optimization was counted when the job was created.
+    quota_reserved = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_finished(self):
+        return self.status in ('DONE', 'FAILED')
+
+    def __str__(self):
+        return f"{self.user} - {self.job_title} ({self.status})"
+
+class TaskWatermark(models.Model):
+    """Last point a periodic job has processed up to, keyed by job name."""
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def get(cls, name):
+        return cls.objects.filter(name=name).values_list('value', flat=True).first()
+
+    @classmethod
+    def advance(cls, name, value):
+        cls.objects.update_or_create(name=name, defaults={'value': value})
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
 class ChatQuestionAnswer(models.Model):
     CATEGORY_CHOICES = [
         ('General', 'General'),
@@ -555,6 +918,9 @@ class UserBadge(models.Model):
     badge = models.ForeignKey(Badge, on_delete=models.CASCADE)
     earned_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        unique_together = ('user', 'badge')
+
 class AnnualReview(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     year = models.PositiveIntegerField()
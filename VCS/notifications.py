@@ -0,0 +1,246 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import get_cache
+from .models import Notification, Profile
+
+logger = logging.getLogger(__name__)
+
+cache = get_cache('notifications')
+
+LATEST_LIMIT = 5
+
+
+def _unread_key(user_id):
+    return f"unread:{user_id}"
+
+
+def _latest_key(user_id):
+    return f"latest:{user_id}"
+
+
+def _watermark_key(user_id):
+    return f"watermark:{user_id}"
+
+
+def _user_keys(user_id):
+    return [_unread_key(user_id), _latest_key(user_id), _watermark_key(user_id)]
+
+
+def invalidate_user_cache(user_id):
+    cache.delete_many(_user_keys(user_id))
+
+
+def unread_count(user):
+    """
+    Unread notifications for the navbar badge. Served from the cache and,
+    on a miss, from the counter kept on Profile instead of a COUNT query.
+    """
+    key = _unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Profile.objects.filter(user=user).values_list(
+            'unread_notifications', flat=True
+        ).first()
+        if count is None:
+            count = Notification.objects.filter(user=user, is_read=False).count()
+        cache.set(key, count)
+    return count
+
+
+def latest_notifications(user):
+    key = _latest_key(user.pk)
+    notes = cache.get(key)
+    if notes is None:
+        notes = list(
+            Notification.objects.filter(user=user).order_by('-created_at')[:LATEST_LIMIT]
+        )
+        cache.set(key, notes)
+    return notes
+
+
+def mark_read(notification):
+    """
+    Mark a single notification as read and keep the unread counter in step.
+    Returns False if it was already read.
+    """
+    updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True)
+    notification.is_read = True
+    if updated:
+        Profile.objects.filter(user_id=notification.user_id, unread_notifications__gt=0).update(
+            unread_notifications=F('unread_notifications') - 1
+        )
+        invalidate_user_cache(notification.user_id)
+    return bool(updated)
+
+
+def _unread_rows():
+    """Unread count of the outer Profile's user, for use in an UPDATE."""
+    return Coalesce(Subquery(
+        Notification.objects.filter(user_id=OuterRef('user_id'), is_read=False)
+        .values('user_id').annotate(total=Count('id')).values('total')
+    ), 0)
+
+
+def mark_all_read(user):
+    """
+    Mark every unread notification of the user as read in one UPDATE. The
+    counter is set from the rows left unread in the same transaction, so a
+    notification created meanwhile is still counted.
+    """
+    with transaction.atomic():
+        updated = Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+        Profile.objects.filter(user=user).update(unread_notifications=_unread_rows())
+    invalidate_user_cache(user.pk)
+    return updated
+
+
+def purge_read_notifications(older_than_days=None, batch_size=None):
+    """
+    Delete read notifications older than NOTIFICATION_RETENTION_DAYS in
+    batches of primary keys, so no single DELETE holds the table for long.
+    """
+    older_than_days = older_than_days or settings.NOTIFICATION_RETENTION_DAYS
+    batch_size = batch_size or settings.NOTIFICATION_FANOUT_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    stale = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+    deleted = 0
+    while True:
+        ids = list(stale.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += Notification.objects.filter(id__in=ids).delete()[0]
+    logger.info("Purged %s read notifications older than %s days", deleted, older_than_days)
+    return deleted
+
+
+def recount_unread(user_ids=None):
+    """
+    Reset Profile.unread_notifications from the notification rows, for the
+    given users or for every profile whose counter has drifted (queryset
+    updates and bulk deletes bypass Notification.save/delete). Returns the
+    number of profiles corrected.
+    """
+    profiles = Profile.objects.annotate(actual=_unread_rows()).exclude(
+        unread_notifications=F('actual')
+    )
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+
+    drifted = list(profiles.values_list('user_id', flat=True))
+    for start in range(0, len(drifted), settings.NOTIFICATION_FANOUT_BATCH_SIZE):
+        batch = drifted[start:start + settings.NOTIFICATION_FANOUT_BATCH_SIZE]
+        Profile.objects.filter(user_id__in=batch).update(unread_notifications=_unread_rows())
+        cache.delete_many([key for user_id in batch for key in _user_keys(user_id)])
+    return len(drifted)
+
+
+def watermark(user):
+    """
+    (highest notification id, unread count) for the user. Cached until the
+    next write for that user, so idle polls never reach the database.
+    """
+    key = _watermark_key(user.pk)
+    found = cache.get(key)
+    if found is None:
+        max_id = Notification.objects.filter(user=user).aggregate(max_id=Max('id'))['max_id'] or 0
+        found = (max_id, unread_count(user))
+        cache.set(key, found)
+    return found
+
+
+def poll_updates(user, last_id=None):
+    """
+    Unread count and the notifications newer than `last_id` for the navbar
+    poll. Answered from the cached watermark; the table is only read when
+    the watermark has moved past `last_id`.
+    """
+    max_id, unread = watermark(user)
+    new = []
+    if last_id is not None and max_id > last_id:
+        new = [
+            {'id': note['id'], 'message': note['message'], 'created_at': note['created_at'].isoformat()}
+            for note in Notification.objects.filter(user=user, id__gt=last_id).order_by('id').values(
+                'id', 'message', 'created_at'
+            )[:LATEST_LIMIT]
+        ]
+    return {'last_id': max_id, 'unread': unread, 'notifications': new}
+
+
+# Named user segments that can be notified in one go. Each entry builds a
+# User queryset from keyword parameters so it can be passed to a task.
+SEGMENTS = {
+    'all': lambda: User.objects.filter(is_active=True),
+    'pro': lambda: User.objects.filter(is_active=True, profile__is_pro=True, profile__is_proplus=False),
+    'proplus': lambda: User.objects.filter(is_active=True, profile__is_proplus=True),
+    'trainees': lambda: User.objects.filter(is_active=True, profile__is_trainee=True),
+    'course': lambda course_id: User.objects.filter(
+        is_active=True, profile__enrollment__course_id=course_id
+    ).distinct(),
+}
+
+
+def segment_users(segment, **params):
+    try:
+        return SEGMENTS[segment](**params)
+    except KeyError:
+        raise ValueError(f"Unknown notification segment: {segment}")
+
+
+def fan_out(users, message, batch_size=None):
+    """
+    Create one notification per user in `users` with bulk_create, bumping the
+    unread counters with one UPDATE per batch. Returns the number created.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_FANOUT_BATCH_SIZE
+    user_ids = users.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+
+    started = time.perf_counter()
+    total = 0
+    batch = []
+    for user_id in user_ids:
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            total += _fan_out_batch(batch, message)
+            batch = []
+    if batch:
+        total += _fan_out_batch(batch, message)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Fanned out %s notifications in %.2fs (%.0f/s)",
+        total, elapsed, total / elapsed if elapsed else 0,
+    )
+    return total
+
+
+def _fan_out_batch(user_ids, message):
+    with transaction.atomic():
+        Notification.objects.bulk_create(
+            [Notification(user_id=user_id, message=message) for user_id in user_ids]
+        )
+        Profile.objects.filter(user_id__in=user_ids).update(
+            unread_notifications=F('unread_notifications') + 1
+        )
+    keys = []
+    for user_id in user_ids:
+        keys += _user_keys(user_id)
+    cache.delete_many(keys)
+    return len(user_ids)
+
+
+def notify_segment(segment, message, **params):
+    """Queue a fan-out to a named segment, e.g. notify_segment('course', msg, course_id=3)."""
+    from .tasks import fan_out_notifications
+
+    segment_users(segment, **params)  # validate before queueing
+    return fan_out_notifications.delay(segment, message, **params)
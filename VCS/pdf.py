@@ -0,0 +1,337 @@
+"""
+PDF rendering for invoices, resume reports and certificates.
+
+Stylesheets, table styles and the decoded logo are built once per process;
+page templates hold per-build frame state, so they are built once per
+thread. Each render function only lays out the document's own content.
+"""
+import logging
+import os
+import threading
+from decimal import Decimal
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import (BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer,
+                                Table, TableStyle)
+
+from .models import Invoice, ResumeReport
+
+logger = logging.getLogger(__name__)
+
+MARGIN = inch
+LOGO_SIZE = 1 * inch
+
+COMPANY_INFO = """
+<b>VCS Career Services Pvt. Ltd.</b><br/>
+123 Career Lane, Tech City<br/>
+Bangalore, Karnataka 560001<br/>
+India<br/>
+GSTIN: 29ABCDE1234F1Z5<br/>
+Email: support@vcs.com | Phone: +91-9876543210
+"""
+
+INVOICE_FOOTER = """
+Thank you for choosing VCS Career Services!<br/>
+Payment Terms: Immediate payment required. For queries, contact support@vcs.com.<br/>
+This is a computer-generated invoice and does not require a signature.
+"""
+
+INVOICE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+INVOICE_TOTALS_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('FONTNAME', (1, 0), (-1, -1), 'Helvetica-Bold'),
+    ('GRID', (1, 0), (-1, -1), 1, colors.black),
+])
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Sample stylesheet plus the custom styles of every document type."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        'InvoiceTitle', parent=styles['Heading1'], fontSize=20, alignment=1,
+        spaceAfter=20, textColor=colors.darkblue,
+    ))
+    styles.add(ParagraphStyle(
+        'InvoiceHeader', parent=styles['Normal'], fontSize=12, alignment=0, spaceAfter=10,
+    ))
+    styles.add(ParagraphStyle(
+        'Footer', parent=styles['Normal'], fontSize=8, alignment=1, textColor=colors.gray,
+    ))
+    styles.add(ParagraphStyle(
+        'ReportTitle', parent=styles['Heading1'], fontSize=16, spaceAfter=12,
+    ))
+    styles.add(ParagraphStyle(
+        'CertificateTitle', parent=styles['Title'], fontSize=32, leading=38,
+        spaceAfter=24, textColor=colors.darkblue,
+    ))
+    styles.add(ParagraphStyle(
+        'CertificateName', parent=styles['Title'], fontSize=26, leading=32, spaceAfter=18,
+    ))
+    styles.add(ParagraphStyle(
+        'CertificateBody', parent=styles['Normal'], fontSize=14, leading=20, alignment=1,
+        spaceAfter=12,
+    ))
+    return styles
+
+
+@lru_cache(maxsize=None)
+def get_logo():
+    """The company logo read and decoded once, or None if it is not deployed."""
+    path = os.path.join(settings.STATIC_ROOT, 'logo.png')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        logo = ImageReader(BytesIO(f.read()))
+    logo.getSize()
+    return logo
+
+
+def _draw_logo(canvas, doc):
+    logo = get_logo()
+    if logo is None:
+        return
+    width, height = doc.pagesize
+    canvas.drawImage(
+        logo, (width - LOGO_SIZE) / 2, height - MARGIN - LOGO_SIZE,
+        LOGO_SIZE, LOGO_SIZE, mask='auto', preserveAspectRatio=True,
+    )
+
+
+def _draw_certificate_border(canvas, doc):
+    width, height = doc.pagesize
+    canvas.saveState()
+    canvas.setStrokeColor(colors.darkblue)
+    canvas.setLineWidth(4)
+    canvas.rect(0.5 * inch, 0.5 * inch, width - inch, height - inch)
+    canvas.setLineWidth(1)
+    canvas.rect(0.6 * inch, 0.6 * inch, width - 1.2 * inch, height - 1.2 * inch)
+    canvas.restoreState()
+
+
+def _frame(pagesize):
+    width, height = pagesize
+    return Frame(MARGIN, MARGIN, width - 2 * MARGIN, height - 2 * MARGIN, id='body')
+
+
+_local = threading.local()
+
+
+def get_page_template(name):
+    """Page templates keyed by document type, built once per thread."""
+    templates = getattr(_local, 'page_templates', None)
+    if templates is None:
+        templates = _local.page_templates = {
+            'invoice': PageTemplate('invoice', [_frame(letter)], onPage=_draw_logo, pagesize=letter),
+            'report': PageTemplate('report', [_frame(letter)], pagesize=letter),
+            'certificate': PageTemplate(
+                'certificate', [_frame(landscape(letter))], onPage=_draw_certificate_border,
+                pagesize=landscape(letter),
+            ),
+        }
+    return templates[name]
+
+
+def _build(template_name, story, title=''):
+    template = get_page_template(template_name)
+    buffer = BytesIO()
+    doc = BaseDocTemplate(
+        buffer, pagesize=template.pagesize, pageTemplates=[template], title=title,
+        leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+    )
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def build_invoice_pdf(invoice):
+    """Render an invoice and return the PDF bytes."""
+    styles = get_styles()
+    elements = []
+
+    # The logo is drawn by the page template; leave room for it.
+    if get_logo() is not None:
+        elements.append(Spacer(1, LOGO_SIZE))
+    elements.append(Spacer(1, 0.2*inch))
+    elements.append(Paragraph(COMPANY_INFO, styles['InvoiceHeader']))
+    elements.append(Spacer(1, 0.5*inch))
+
+    elements.append(Paragraph("INVOICE", styles['InvoiceTitle']))
+    elements.append(Spacer(1, 0.3*inch))
+
+    invoice_details = f"""
+    <b>Invoice Number:</b> {invoice.invoice_number}<br/>
+    <b>Invoice Date:</b> {invoice.date.strftime('%d-%m-%Y')}<br/>
+    <b>Due Date:</b> {invoice.date.strftime('%d-%m-%Y')} (Immediate)<br/>
+    <b>Payment Status:</b> {'Paid' if invoice.paid else 'Pending'}
+    """
+    elements.append(Paragraph(invoice_details, styles['InvoiceHeader']))
+    elements.append(Spacer(1, 0.3*inch))
+
+    bill_to = f"""
+    <b>Bill To:</b><br/>
+    {escape(invoice.user.username)}<br/>
+    {escape(invoice.user.email)}<br/>
+    (Subscription User)
+    """
+    elements.append(Paragraph(bill_to, styles['InvoiceHeader']))
+    elements.append(Spacer(1, 0.3*inch))
+
+    data = [
+        ['Description', 'Quantity', 'Unit Price', 'Total'],
+        [f"{invoice.subscription.plan_name} Subscription ({invoice.subscription.billing_cycle})", '1', f"₹{invoice.amount}", f"₹{invoice.amount}"],
+    ]
+    table = Table(data, colWidths=[3*inch, 1*inch, 1.5*inch, 1.5*inch])
+    table.setStyle(INVOICE_TABLE_STYLE)
+    elements.append(table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    subtotal = invoice.amount
+    gst = subtotal * Decimal('0.18') # 18% GST (adjust as needed)
+    total = subtotal + gst
+
+    totals_data = [
+        ['', 'Subtotal:', f"₹{subtotal}"],
+        ['', 'GST (18%):', f"₹{gst:.2f}"],
+        ['', 'Total:', f"₹{total:.2f}"],
+    ]
+    totals_table = Table(totals_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
+    totals_table.setStyle(INVOICE_TOTALS_STYLE)
+    elements.append(totals_table)
+    elements.append(Spacer(1, 0.5*inch))
+
+    elements.append(Paragraph(INVOICE_FOOTER, styles['Footer']))
+
+    return _build('invoice', elements, title=f"Invoice {invoice.invoice_number}")
+
+
+def build_resume_report_pdf(job_title, resume_text, suggestions):
+    """Render the resume optimizer report and return the PDF bytes."""
+    styles = get_styles()
+    story = [
+        Paragraph(f"Enhanced Resume for {escape(job_title)}", styles['ReportTitle']),
+        Spacer(1, 12),
+        Paragraph("Original Resume:", styles['Heading2']),
+        Paragraph(escape(resume_text).replace('\n', '<br/>'), styles['Normal']),
+        Spacer(1, 12),
+        Paragraph("Suggestions Applied:", styles['Heading2']),
+        Paragraph("<br/>".join(escape(s) for s in suggestions), styles['Normal']),
+    ]
+    return _build('report', story, title=f"Enhanced Resume for {job_title}")
+
+
+def build_certificate_pdf(certificate):
+    """Render a course completion certificate and return the PDF bytes."""
+    styles = get_styles()
+    enrollment = certificate.enrollment
+    user = enrollment.profile.user
+    name = user.get_full_name() or user.username
+    story = [
+        Spacer(1, 0.6*inch),
+        Paragraph("Certificate of Completion", styles['CertificateTitle']),
+        Paragraph("This is to certify that", styles['CertificateBody']),
+        Paragraph(escape(name), styles['CertificateName']),
+        Paragraph("has successfully completed the course", styles['CertificateBody']),
+        Paragraph(f"<b>{escape(enrollment.course.title)}</b>", styles['CertificateBody']),
+        Spacer(1, 0.4*inch),
+        Paragraph(
+            f"Issued on {certificate.issued_at.strftime('%d %B %Y')} by VCS Career Services",
+            styles['CertificateBody'],
+        ),
+    ]
+    return _build('certificate', story, title=f"Certificate - {enrollment.course.title}")
+
+
+def render_invoice(invoice):
+    """
+    Render the invoice PDF into invoice.file and mark it READY. Marks it
+    FAILED and re-raises if rendering fails.
+    """
+    Invoice.objects.filter(pk=invoice.pk).update(render_status='RENDERING')
+    try:
+        content = build_invoice_pdf(invoice)
+    except Exception:
+        Invoice.objects.filter(pk=invoice.pk).update(render_status='FAILED')
+        invoice.render_status = 'FAILED'
+        raise
+    invoice.file.save(f"{invoice.invoice_number}.pdf", ContentFile(content), save=False)
+    invoice.render_status = 'READY'
+    invoice.save(update_fields=['file', 'render_status'])
+    return invoice
+
+
+def ensure_invoice_pdf(invoice):
+    """Return the invoice with a rendered file, rendering it now if the task has not."""
+    if invoice.render_status == 'READY' and invoice.file:
+        return invoice
+    return render_invoice(invoice)
+
+
+def render_certificate(certificate):
+    content = build_certificate_pdf(certificate)
+    certificate.certificate_file.save(
+        f"certificate-{certificate.pk}.pdf", ContentFile(content), save=False
+    )
+    certificate.save(update_fields=['certificate_file'])
+    return certificate
+
+
+def ensure_resume_report_pdf(report):
+    """Render the report on first download; later downloads reuse the stored file."""
+    if report.file:
+        return report
+    content = build_resume_report_pdf(report.job_title, report.resume_text, report.suggestions)
+    report.file.save(f"{report.content_hash}.pdf", ContentFile(content), save=False)
+    # Another request may have rendered it meanwhile; keep whichever landed first.
+    unrendered = Q(file='') | Q(file__isnull=True)
+    if not ResumeReport.objects.filter(unrendered, pk=report.pk).update(file=report.file.name):
+        report.file.delete(save=False)
+        report.refresh_from_db(fields=['file'])
+    return report
+
+
+def queue_invoice_render(invoice):
+    """Render the invoice in the background once the current transaction commits."""
+    from .tasks import render_invoice_pdf
+
+    def _queue():
+        try:
+            render_invoice_pdf.delay(invoice.pk)
+        except Exception as e:
+            # The download endpoint renders on demand.
+            logger.warning(f"Could not queue invoice render for {invoice.invoice_number}: {e}")
+
+    transaction.on_commit(_queue)
+
+
+def queue_certificate_render(certificate):
+    """Render the certificate in the background once the current transaction commits."""
+    from .tasks import render_certificate_pdf
+
+    def _queue():
+        try:
+            render_certificate_pdf.delay(certificate.pk)
+        except Exception as e:
+            logger.warning(f"Could not queue certificate render for {certificate.pk}: {e}")
+
+    transaction.on_commit(_queue)
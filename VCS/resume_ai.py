@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signing import BadSignature, TimestampSigner
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import get_cache
+from .gemini import ask_gemini
+from .keywords import analyze_keywords
+from .models import ResumeAnalysisJob, ResumeReport
+
+logger = logging.getLogger(__name__)
+
+cache = get_cache('resume_ai')
+
+AI_UNAVAILABLE = "⚠️ AI service is temporarily unavailable."
+
+
+def normalize_resume(text):
+    """Collapse whitespace so re-pasted copies of the same resume hash alike."""
+    lines = (re.sub(r'[ \t]+', ' ', line).strip() for line in text.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def result_key(job_title, resume_text):
+    title = " ".join(job_title.split()).casefold()
+    digest = hashlib.sha256(f"{title}\0{normalize_resume(resume_text)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _parse_json(response_text):
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Resume analysis JSON extraction failed: {e}")
+        else:
+            logger.warning("Resume analysis response contained no JSON")
+    return None
+
+
+def _local_suggestions(missing_keywords):
+    if not missing_keywords:
+        return ["Your resume already covers the key skills for this role; quantify your impact where you can."]
+    return [
+        f"Add concrete experience with {keyword} if you have it." for keyword in missing_keywords[:5]
+    ]
+
+
+def _gemini_suggestions(job_title, resume_text, analysis):
+    """Prose suggestions from Gemini, or None if it is unavailable or unparseable."""
+    prompt = f"""
+    Give improvement suggestions for this resume for the job: {job_title}.
+    Skills it already shows: {", ".join(analysis['matched_keywords'][:15]) or "none detected"}.
+    Skills the role asks for that it lacks: {", ".join(analysis['missing_keywords'][:15]) or "none"}.
+    Resume text (truncated): {resume_text[:1500]}
+
+    Return ONLY the JSON object, no other text:
+    {{"suggestions": ["Add cloud experience.", "Highlight projects."]}}
+    """
+    response_text = ask_gemini(prompt)
+    if response_text == AI_UNAVAILABLE:
+        return None
+    data = _parse_json(response_text)
+    suggestions = data.get('suggestions') if isinstance(data, dict) else None
+    if not suggestions or not isinstance(suggestions, list):
+        return None
+    return [str(s) for s in suggestions]
+
+
+def analyze_resume(job_title, resume_text):
+    """
+    Keyword gap analysis of the full resume against the role, computed
+    locally, with Gemini only asked for prose suggestions. The result has a
+    `complete` flag that is False when Gemini did not answer and generic
+    suggestions were used instead.
+    """
+    analysis = analyze_keywords(job_title, resume_text)
+    suggestions = _gemini_suggestions(job_title, resume_text, analysis)
+    result = dict(analysis, complete=suggestions is not None)
+    result['suggestions'] = suggestions or _local_suggestions(analysis['missing_keywords'])
+    result['report_id'] = save_report(job_title, resume_text, result['suggestions']).pk
+    return result
+
+
+def save_report(job_title, resume_text, suggestions):
+    """
+    Store the report content under its content hash. The PDF is not built
+    here; a stale one is dropped if the suggestions changed.
+    """
+    report, created = ResumeReport.objects.get_or_create(
+        content_hash=result_key(job_title, resume_text),
+        defaults={
+            'job_title': job_title[:255],
+            'resume_text': resume_text,
+            'suggestions': suggestions,
+        },
+    )
+    if not created and report.suggestions != suggestions:
+        if report.file:
+            report.file.delete(save=False)
+        report.suggestions = suggestions
+        report.save(update_fields=['suggestions', 'file'])
+    return report
+
+
+def cached_analysis(job_title, resume_text):
+    return cache.get(result_key(job_title, resume_text))
+
+
+def get_analysis(job_title, resume_text):
+    """
+    (result, cached) for a job title and resume. Identical submissions, up
+    to whitespace and title case, are answered from the cache. Results
+    without Gemini suggestions are not cached so a later submission can try
+    again.
+    """
+    result = cached_analysis(job_title, resume_text)
+    if result is not None:
+        return result, True
+
+    result = analyze_resume(job_title, resume_text)
+    if result['complete']:
+        cache.set(result_key(job_title, resume_text), result, settings.RESUME_AI_CACHE_TIMEOUT)
+    return result, False
+
+
+def _refund_quota(job):
+    if job.quota_reserved:
+        job.user.profile.decrement_usage('resume_optimizations_this_month')
+
+
+def _finish(job, from_status, **fields):
+    """
+    Move a job out of `from_status` with a conditional UPDATE, so a job that
+    timed out meanwhile is not overwritten. Refunds the reserved optimization
+    if the job failed, or was answered from the cache while cache hits are
+    free. Returns False if the job was no longer in `from_status`.
+    """
+    fields.setdefault('finished_at', timezone.now())
+    if not ResumeAnalysisJob.objects.filter(pk=job.pk, status=from_status).update(**fields):
+        return False
+    for name, value in fields.items():
+        setattr(job, name, value)
+    if job.status == 'FAILED' or (job.from_cache and not settings.RESUME_AI_CACHE_HITS_CONSUME_QUOTA):
+        _refund_quota(job)
+    return True
+
+
+def start_analysis(user, job_title, resume_text):
+    """
+    Create a ResumeAnalysisJob, counting one resume optimization up front so
+    concurrent submissions cannot overrun the monthly limit; the count is
+    given back if the job fails. Returns None if the limit is reached. A
+    cached result completes the job immediately; otherwise it is handed to
+    the run_resume_analysis task after commit.
+    """
+    result = cached_analysis(job_title, resume_text)
+    quota_reserved = result is None or settings.RESUME_AI_CACHE_HITS_CONSUME_QUOTA
+    if quota_reserved and not user.profile.reserve_usage('resume'):
+        return None
+
+    job = ResumeAnalysisJob.objects.create(
+        user=user, job_title=job_title[:255], resume_text=resume_text, quota_reserved=quota_reserved
+    )
+    if result is not None:
+        _finish(job, 'PENDING', status='DONE', result=result, from_cache=True)
+        return job
+
+    from .tasks import run_resume_analysis
+
+    def _queue():
+        try:
+            run_resume_analysis.delay(job.pk)
+        except Exception as e:
+            logger.error(f"Could not queue resume analysis {job.pk}: {e}")
+            _finish(job, 'PENDING', status='FAILED', error="Could not start the analysis.")
+
+    transaction.on_commit(_queue)
+    return job
+
+
+def run_analysis_job(job_id):
+    """Claim a pending job, run the analysis and store its result."""
+    claimed = ResumeAnalysisJob.objects.filter(pk=job_id, status='PENDING').update(
+        status='RUNNING', started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    job = ResumeAnalysisJob.objects.select_related('user__profile').get(pk=job_id)
+    try:
+        result, from_cache = get_analysis(job.job_title, job.resume_text)
+    except Exception as e:
+        logger.exception(f"Resume analysis {job.pk} failed")
+        _finish(job, 'RUNNING', status='FAILED', error=str(e))
+    else:
+        if not _finish(job, 'RUNNING', status='DONE', result=result, from_cache=from_cache):
+            logger.warning(f"Resume analysis {job.pk} finished after it timed out")
+    return job
+
+
+def fail_stale_jobs(jobs=None):
+    """
+    Fail jobs left PENDING or RUNNING for longer than
+    RESUME_ANALYSIS_STALE_AFTER seconds, e.g. by a lost task or a crashed
+    worker, and refund their optimization. Returns the number failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.RESUME_ANALYSIS_STALE_AFTER)
+    jobs = jobs if jobs is not None else ResumeAnalysisJob.objects.all()
+    stale = jobs.filter(
+        Q(started_at__lt=cutoff) | Q(started_at__isnull=True, created_at__lt=cutoff),
+        status__in=('PENDING', 'RUNNING'),
+    ).select_related('user__profile')
+    failed = 0
+    for job in stale.iterator():
+        if _finish(job, job.status, status='FAILED', error="The analysis timed out."):
+            failed += 1
+    return failed
+
+
+def _signer():
+    return TimestampSigner(salt='resume-report')
+
+
+def report_url(report_id):
+    """Short-lived signed download link for a resume report."""
+    return reverse('resume_report_download', args=[_signer().sign(str(report_id))])
+
+
+def load_report(token):
+    """The report a signed link points at, or None if it is forged or expired."""
+    try:
+        report_id = _signer().unsign(token, max_age=settings.RESUME_REPORT_URL_MAX_AGE)
+    except BadSignature:
+        return None
+    return ResumeReport.objects.filter(pk=report_id).first()
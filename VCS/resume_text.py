@@ -0,0 +1,188 @@
+"""
+One-time text extraction for uploaded resumes.
+
+Files are hashed in a background task; the text of each distinct file is
+extracted once into ResumeText and shared by every Profile and
+JobApplication that carries the same file. PDFs are read with pypdf (see
+requirements.txt); DOCX and TXT are read with the standard library.
+"""
+import hashlib
+import logging
+import os
+import re
+import zipfile
+from xml.etree import ElementTree
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .keywords import tokenize
+from .models import JobApplication, Profile, ResumeText
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional dependency
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Models with a `resume` file and a `resume_sha256` field, by task label.
+RESUME_MODELS = {
+    'profile': Profile,
+    'application': JobApplication,
+}
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(Exception):
+    pass
+
+
+def file_sha256(field_file):
+    digest = hashlib.sha256()
+    with field_file.open('rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _pdf_text(f):
+    if PdfReader is None:
+        raise ExtractionError("PDF extraction needs the pypdf package")
+    return "\n".join(page.extract_text() or '' for page in PdfReader(f).pages)
+
+
+def _docx_text(f):
+    try:
+        with zipfile.ZipFile(f) as archive:
+            root = ElementTree.fromstring(archive.read('word/document.xml'))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise ExtractionError(f"Not a readable DOCX file: {e}")
+    paragraphs = []
+    for paragraph in root.iter(f'{WORD_NS}p'):
+        paragraphs.append("".join(node.text or '' for node in paragraph.iter(f'{WORD_NS}t')))
+    return "\n".join(paragraphs)
+
+
+def _txt_text(f):
+    data = f.read()
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+EXTRACTORS = {
+    '.pdf': _pdf_text,
+    '.docx': _docx_text,
+    '.txt': _txt_text,
+}
+
+
+def normalize_text(text):
+    lines = (re.sub(r'\s+', ' ', line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def extract_text(field_file):
+    extension = os.path.splitext(field_file.name)[1].lower()
+    try:
+        extractor = EXTRACTORS[extension]
+    except KeyError:
+        raise ExtractionError(f"Unsupported resume format: {extension or 'unknown'}")
+    with field_file.open('rb') as f:
+        return normalize_text(extractor(f))
+
+
+def _extract(resume_text, field_file):
+    try:
+        text = extract_text(field_file)
+    except Exception as e:
+        logger.warning(f"Resume extraction failed for {field_file.name}: {e}")
+        resume_text.status, resume_text.error = 'FAILED', str(e)
+    else:
+        resume_text.status, resume_text.error = 'DONE', ''
+        resume_text.text = text
+        resume_text.tokens = sorted(set(tokenize(text)))
+    resume_text.extracted_at = timezone.now()
+    resume_text.save(update_fields=['status', 'error', 'text', 'tokens', 'extracted_at'])
+
+
+def index_resume(label, pk):
+    """
+    Hash the resume of a Profile or JobApplication, record the hash on the
+    row and extract the text unless that file was already extracted.
+    Returns the ResumeText, or None if the row has no resume.
+    """
+    model = RESUME_MODELS[label]
+    obj = model.objects.filter(pk=pk).first()
+    if obj is None:
+        return None
+    if not obj.resume:
+        model.objects.filter(pk=pk).update(resume_sha256='')
+        return None
+
+    name = obj.resume.name
+    sha256 = file_sha256(obj.resume)
+    # Only record the hash if the file was not replaced while we read it.
+    model.objects.filter(pk=pk, resume=name).update(resume_sha256=sha256)
+
+    try:
+        with transaction.atomic():
+            resume_text, created = ResumeText.objects.get_or_create(sha256=sha256)
+    except IntegrityError:
+        resume_text, created = ResumeText.objects.get(sha256=sha256), False
+    # A PENDING row left behind by a crashed worker is retried like a failure.
+    if created or resume_text.status != 'DONE':
+        _extract(resume_text, obj.resume)
+    return resume_text
+
+
+def queue_resume_indexing(obj):
+    """Index the resume of `obj` in the background once the current transaction commits."""
+    from .tasks import index_resume_file
+
+    label = next(label for label, model in RESUME_MODELS.items() if isinstance(obj, model))
+
+    def _queue():
+        try:
+            index_resume_file.delay(label, obj.pk)
+        except Exception as e:
+            logger.warning(f"Could not queue resume indexing for {label} {obj.pk}: {e}")
+
+    transaction.on_commit(_queue)
+
+
+def resume_tokens(sha256):
+    """Token set of an extracted resume, empty if it is missing or not extracted yet."""
+    if not sha256:
+        return set()
+    tokens = ResumeText.objects.filter(sha256=sha256, status='DONE').values_list('tokens', flat=True).first()
+    return set(tokens or [])
+
+
+def profile_tokens(profile):
+    """
+    Tokens of a profile's skills and extracted resume, or None while the
+    resume has not been extracted, so callers can fall back to the skills.
+    """
+    tokens = resume_tokens(profile.resume_sha256)
+    if not tokens:
+        return None
+    return tokens | set(tokenize(profile.skills))
+
+
+def match_score(tokens, job_description):
+    """Share (0-100) of a job description's distinct tokens covered by `tokens`."""
+    job_tokens = set(tokenize(job_description))
+    if not job_tokens:
+        return 0.0
+    return len(job_tokens & tokens) / len(job_tokens) * 100
+
+
+def matching_resume_hashes(query):
+    """Hashes of extracted resumes whose text contains `query`, for candidate search."""
+    return ResumeText.objects.filter(status='DONE', text__icontains=query).values('sha256')
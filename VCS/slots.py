@@ -0,0 +1,97 @@
+"""
+Interview slot availability for the scheduling calendar.
+
+Availability is kept as one cached map per month ({day: free slots}),
+built with a single query over InterviewSlot and dropped whenever a slot
+on that month is reserved or released. Days without a row have the
+default capacity; reading availability never creates rows.
+"""
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from .cache import get_cache
+
+cache = get_cache('slots')
+
+AVAILABILITY_CACHE_TIMEOUT = 60 * 60 * 24
+MAX_RANGE_DAYS = 366
+
+
+def _month_key(year, month):
+    return f"month:{year}-{month:02d}"
+
+
+def _months(start, end):
+    """(year, month) pairs covering start..end inclusive."""
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _month_bounds(year, month):
+    first = date(year, month, 1)
+    following = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return first, following - timedelta(days=1)
+
+
+def _build_months(months):
+    """Availability maps for several months from one InterviewSlot query."""
+    from .models import InterviewSlot
+
+    default = InterviewSlot._meta.get_field('max_slots').get_default()
+    maps = {}
+    for year, month in months:
+        first, last = _month_bounds(year, month)
+        maps[(year, month)] = {
+            first + timedelta(days=offset): default for offset in range((last - first).days + 1)
+        }
+    if not maps:
+        return maps
+
+    start = _month_bounds(*min(maps))[0]
+    end = _month_bounds(*max(maps))[1]
+    rows = InterviewSlot.objects.filter(date__range=(start, end)).values_list(
+        'date', 'max_slots', 'used_slots'
+    )
+    for day, max_slots, used_slots in rows:
+        month_map = maps.get((day.year, day.month))
+        if month_map is not None:
+            month_map[day] = max(0, max_slots - used_slots)
+    return maps
+
+
+def availability(start, end):
+    """{date: free slots} for every day from start to end inclusive."""
+    months = list(_months(start, end))
+    found = cache.get_many(_month_key(y, m) for y, m in months)
+    maps = {(y, m): found[_month_key(y, m)] for y, m in months if _month_key(y, m) in found}
+
+    missing = [month for month in months if month not in maps]
+    if missing:
+        built = _build_months(missing)
+        cache.set_many(
+            {_month_key(y, m): month_map for (y, m), month_map in built.items()},
+            AVAILABILITY_CACHE_TIMEOUT,
+        )
+        maps.update(built)
+
+    return {
+        day: free
+        for month in months
+        for day, free in maps[month].items()
+        if start <= day <= end
+    }
+
+
+def free_slots(day):
+    return availability(day, day)[day]
+
+
+def invalidate_availability(day):
+    """Drop the cached month of `day`, now and again once the transaction commits."""
+    key = _month_key(day.year, day.month)
+    cache.delete(key)
+    # A reader between now and commit may re-cache the old count.
+    transaction.on_commit(lambda: cache.delete(key))
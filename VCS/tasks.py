@@ -0,0 +1,77 @@
+from celery import shared_task
+from django.contrib.auth.models import User
+
+from .badges import award_badges, award_badges_since_watermark, notify_awards
+from .emails import drain_outbox
+from .models import Certificate, Invoice
+from .notifications import fan_out, segment_users, purge_read_notifications, recount_unread
+from .pdf import render_certificate, render_invoice
+from .resume_ai import fail_stale_jobs, run_analysis_job
+from .resume_text import index_resume
+
+
+@shared_task
+def fan_out_notifications(segment, message, **params):
+    return fan_out(segment_users(segment, **params), message)
+
+
+@shared_task
+def purge_old_notifications():
+    deleted = purge_read_notifications()
+    # Daily safety net for counters moved by queryset updates or bulk deletes.
+    recount_unread()
+    return deleted
+
+
+@shared_task
+def drain_email_outbox():
+    return drain_outbox()
+
+
+@shared_task
+def award_badges_for_active_users():
+    return award_badges_since_watermark()
+
+
+@shared_task
+def award_user_badges(user_id):
+    awarded = award_badges(User.objects.filter(pk=user_id))
+    notify_awards(awarded)
+    return len(awarded)
+
+
+@shared_task
+def render_invoice_pdf(invoice_id):
+    invoice = Invoice.objects.select_related('user', 'subscription').filter(pk=invoice_id).first()
+    if invoice is None or invoice.render_status == 'READY':
+        return None
+    render_invoice(invoice)
+    return invoice.file.name
+
+
+@shared_task
+def render_certificate_pdf(certificate_id):
+    certificate = Certificate.objects.select_related(
+        'enrollment__profile__user', 'enrollment__course'
+    ).filter(pk=certificate_id).first()
+    if certificate is None:
+        return None
+    render_certificate(certificate)
+    return certificate.certificate_file.name
+
+
+@shared_task
+def run_resume_analysis(job_id):
+    job = run_analysis_job(job_id)
+    return job.status if job else None
+
+
+@shared_task
+def fail_stale_resume_analyses():
+    return fail_stale_jobs()
+
+
+@shared_task
+def index_resume_file(label, pk):
+    resume_text = index_resume(label, pk)
+    return resume_text.status if resume_text else None
@@ -1,3 +1,224 @@
-from django.test import TestCase
+import importlib
+import threading
+import time
+from datetime import date, datetime, time as clock, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+
+from .cache import get_cache
+from .emails import queue_email
+from .models import Appointment, EmailOutbox, InterviewSlot, Job, JobApplication, Profile
+
+
+class InterviewSlotReserveTests(TestCase):
+    def setUp(self):
+        self.day = date.today() + timedelta(days=7)
+
+    def test_reserve_until_full(self):
+        InterviewSlot.objects.create(date=self.day, max_slots=2)
+        self.assertTrue(InterviewSlot.reserve(self.day))
+        self.assertTrue(InterviewSlot.reserve(self.day))
+        self.assertFalse(InterviewSlot.reserve(self.day))
+        self.assertEqual(InterviewSlot.objects.get(date=self.day).used_slots, 2)
+
+    def test_reserve_creates_missing_date(self):
+        self.assertTrue(InterviewSlot.reserve(self.day))
+        self.assertEqual(InterviewSlot.objects.get(date=self.day).used_slots, 1)
+
+    def test_release(self):
+        InterviewSlot.objects.create(date=self.day, max_slots=1, used_slots=1)
+        self.assertTrue(InterviewSlot.release(self.day))
+        self.assertFalse(InterviewSlot.release(self.day))
+        self.assertEqual(InterviewSlot.objects.get(date=self.day).used_slots, 0)
+
+    def test_rolled_back_booking_frees_slot(self):
+        InterviewSlot.objects.create(date=self.day, max_slots=1)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                InterviewSlot.reserve(self.day)
+                raise RuntimeError("booking failed")
+        self.assertEqual(InterviewSlot.objects.get(date=self.day).used_slots, 0)
+
+
+class InterviewSlotConcurrencyTests(TransactionTestCase):
+    workers = 12
+    max_slots = 5
+
+    def _reserve(self, day):
+        # The in-memory SQLite test database refuses a write while another
+        # connection holds the table lock instead of waiting; nothing was
+        # written, so try again.
+        while True:
+            try:
+                with transaction.atomic():
+                    return InterviewSlot.reserve(day)
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                time.sleep(0.001)
+
+    def test_parallel_reservations_do_not_overbook(self):
+        day = date.today() + timedelta(days=7)
+        InterviewSlot.objects.create(date=day, max_slots=self.max_slots)
+        barrier = threading.Barrier(self.workers)
+        results, errors = [], []
+
+        def book():
+            try:
+                barrier.wait()
+                results.append(self._reserve(day))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count(True), self.max_slots)
+        self.assertEqual(results.count(False), self.workers - self.max_slots)
+        self.assertEqual(InterviewSlot.objects.get(date=day).used_slots, self.max_slots)
+
+
+class PostponeAppointmentSlotTests(TestCase):
+    def setUp(self):
+        self.old_day = date.today() + timedelta(days=7)
+        self.new_day = self.old_day + timedelta(days=7)
+        candidate = User.objects.create_user('candidate')
+        job = Job.objects.create(
+            company_name='Acme', job_title='Engineer', location='Remote', salary_range=50000
+        )
+        self.appointment = Appointment.objects.create(
+            application=JobApplication.objects.create(user=candidate, job=job),
+            appointment_type='INTERVIEW',
+            scheduled_at=self._at(self.old_day),
+        )
+        InterviewSlot.objects.create(date=self.old_day, max_slots=1, used_slots=1)
+        self.client.force_login(User.objects.create_user('recruiter', is_staff=True))
+
+    def _at(self, day):
+        return timezone.make_aware(datetime.combine(day, clock(10)))
+
+    def _postpone(self, day):
+        return self.client.post(
+            reverse('appointment_postpone', args=[self.appointment.pk]),
+            {'scheduled_at': self._at(day).strftime('%Y-%m-%dT%H:%M'), 'notes': ''},
+        )
+
+    def test_postpone_moves_the_slot(self):
+        self.assertTrue(self._postpone(self.new_day).json()['success'])
+        self.assertEqual(InterviewSlot.objects.get(date=self.old_day).used_slots, 0)
+        self.assertEqual(InterviewSlot.objects.get(date=self.new_day).used_slots, 1)
+
+    def test_postpone_to_full_date_is_rejected(self):
+        InterviewSlot.objects.create(date=self.new_day, max_slots=1, used_slots=1)
+        self.assertFalse(self._postpone(self.new_day).json()['success'])
+        self.appointment.refresh_from_db()
+        self.assertEqual(self.appointment.scheduled_at, self._at(self.old_day))
+        self.assertEqual(InterviewSlot.objects.get(date=self.old_day).used_slots, 1)
+
+
+class EditAppointmentSlotTests(TestCase):
+    def setUp(self):
+        self.day = date.today() + timedelta(days=7)
+        self.candidate = User.objects.create_user('candidate')
+        Profile.objects.get_or_create(user=self.candidate)
+        job = Job.objects.create(
+            company_name='Acme', job_title='Engineer', location='Remote', salary_range=50000
+        )
+        self.appointment = Appointment.objects.create(
+            application=JobApplication.objects.create(user=self.candidate, job=job),
+            appointment_type='INTERVIEW',
+            scheduled_at=timezone.make_aware(datetime.combine(self.day, clock(10))),
+        )
+        InterviewSlot.objects.create(date=self.day, max_slots=1, used_slots=1)
+        self.client.force_login(User.objects.create_user('recruiter', is_staff=True))
+
+    def _edit(self, day, hour):
+        return self.client.post(
+            reverse('appointment_edit', args=[self.appointment.pk]),
+            {
+                'user': self.candidate.pk,
+                'scheduled_at': f"{day.isoformat()}T{hour:02d}:00",
+                'notes': '',
+            },
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+
+    def test_time_change_on_fully_booked_day(self):
+        self.assertTrue(self._edit(self.day, 15).json()['success'])
+        self.appointment.refresh_from_db()
+        self.assertEqual(self.appointment.scheduled_at.hour, 15)
+        self.assertEqual(InterviewSlot.objects.get(date=self.day).used_slots, 1)
+
+    def test_move_to_fully_booked_day_is_rejected(self):
+        other_day = self.day + timedelta(days=1)
+        InterviewSlot.objects.create(date=other_day, max_slots=1, used_slots=1)
+        self.assertIn("No available slots for this date.", self._edit(other_day, 10).json()['html'])
+        self.assertEqual(InterviewSlot.objects.get(date=self.day).used_slots, 1)
+
+
+class ProtectedMediaTests(TestCase):
+    def setUp(self):
+        # static() only adds its routes while DEBUG is on, which the test
+        # runner turns off before the URLconf is loaded.
+        import myapp.urls
+
+        with override_settings(DEBUG=True):
+            importlib.reload(myapp.urls)
+        clear_url_caches()
+        self.addCleanup(clear_url_caches)
+        self.addCleanup(importlib.reload, myapp.urls)
+
+    def _stored(self, name):
+        name = default_storage.save(name, ContentFile(b'%PDF-1.4'))
+        self.addCleanup(default_storage.delete, name)
+        return name
+
+    def test_protected_uploads_are_not_served_from_media_url(self):
+        name = self._stored('resumes/candidate.pdf')
+        self.client.force_login(User.objects.create_user('someone'))
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 404)
+
+    def test_public_uploads_are_served(self):
+        name = self._stored('badges/icon.png')
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 200)
+
+
+class QueueEmailTests(TestCase):
+    def test_eager_tasks_deliver_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            email = queue_email('Welcome', 'Hello', 'noreply@example.com', ['candidate@example.com'])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['candidate@example.com'])
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'SENT')
+
+    def test_nothing_is_sent_before_commit(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            queue_email('Welcome', 'Hello', 'noreply@example.com', ['candidate@example.com'])
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(EmailOutbox.objects.get().status, 'PENDING')
+
+
+class NamespacedCacheVersionTests(TestCase):
+    def test_global_version_invalidates_namespaces(self):
+        cache = get_cache('slots')
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        with override_settings(CACHE_NAMESPACES={'slots': 2}):
+            self.assertIsNone(cache.get('key'))
+        cache.backend.version += 1
+        self.addCleanup(setattr, cache.backend, 'version', cache.backend.version - 1)
+        self.assertIsNone(cache.get('key'))
@@ -10,7 +10,8 @@ from .views import (home,signup,job_list,search,job_detail,save_job,apply_job,
                     send_support_query,candidate_chat,send_message,clear_chat,
                     chatbot_api,chat_history,chatfaq_delete,chatfaq_list,chatfaq_save,
                     mark_query_resolved,reply_query,payment_success,calendar_events,
-                    appointment_list_api,admin_calendar,consultant_dashboard,
+                    appointment_list_api,admin_calendar,consultant_dashboard,slot_availability,
+                    calendar_feed,reset_calendar_feed,
                     appointment_list,create_interview_appointment,create_one_on_one_appointment,
                     edit_appointment,postpone_appointment,update_appointment_status,
                     schedule_mock_interview,upload_mock_feedback,mark_done_with_feedback,
@@ -19,7 +20,9 @@ from .views import (home,signup,job_list,search,job_detail,save_job,apply_job,
                     admin_course_details,admin_user_progress,sync_progress,
                     admin_courses,admin_add_course,admin_consultant_tracking,
                     ratelimit_error,trainee_login,admin_create_trainee,admin_trainees,
-                    admin_edit_trainee,admin_delete_trainee,)
+                    admin_edit_trainee,admin_delete_trainee,cache_health,notification_poll,mark_all_notifications_read,
+                    download_invoice,download_file,resume_report_download,
+                    resume_analysis_status,)
 
 urlpatterns = [
     path('', home, name='home'),
@@ -35,10 +38,16 @@ urlpatterns = [
     path('applied-jobs/', applied_jobs, name='applied_jobs'),
     path('upgrade/', upgrade_plan, name='upgrade_plan'),
     path('subscription/', subscription_dashboard, name='subscription'),
+    path('invoices/<int:invoice_id>/download/', download_invoice, name='download_invoice'),
+    path('files/<slug:kind>/<int:pk>/', download_file, name='download_file'),
     path('job-matching/', job_matching, name='job_matching'),
     path('resume-ai/', ai_resume_optimizer, name='resume_ai'),
+    path('resume-ai/report/<str:token>/', resume_report_download, name='resume_report_download'),
+    path('resume-ai/jobs/<int:job_id>/', resume_analysis_status, name='resume_analysis_status'),
     path('courses/', courses, name='courses'),
     path('notifications/', notifications, name='notifications'),
+    path('notifications/poll/', notification_poll, name='notification_poll'),
+    path('notifications/read-all/', mark_all_notifications_read, name='mark_all_notifications_read'),
     path("notifications/read/<int:notification_id>/", mark_notification_read, name="mark_notification_read"),
     path('admin/job/<int:job_id>/applications/', admin_job_applications, name='admin_job_applications'),
     path('application/<int:application_id>/',application_tracker,name='application_tracker'),
@@ -72,14 +81,17 @@ urlpatterns = [
     path('dashboard/jobs/edit/<int:job_id>/', edit_job, name='edit_job'),
     path('dashboard/jobs/delete/<int:job_id>/', delete_job, name='delete_job'),
     path('dashboard/analytics/', admin_analytics, name='admin_analytics'),
+    path('dashboard/cache/health/', cache_health, name='cache_health'),
     path('dashboard/applications/<int:application_id>/', admin_application_detail, name='admin_application_detail'),
     path('dashboard/applications/status/<str:status>/', admin_applications_by_status, name='admin_applications_by_status'),
     
 
     path("dashboard/consultant/",consultant_dashboard,name="consultant_dashboard"),
-    path("dashboard/appointments/list/", appointment_list_api,name="appointment_list"),
+    path("dashboard/appointments/list/", appointment_list_api,name="appointment_list_api"),
     path("dashboard/calendar/", admin_calendar, name="admin_calendar"),
     path("dashboard/calendar/events/", calendar_events, name="calendar_events"),
+    path("calendar/feed/<str:token>.ics", calendar_feed, name="calendar_feed"),
+    path("calendar/feed/reset/", reset_calendar_feed, name="reset_calendar_feed"),
     path('user/feedbacks/', user_feedbacks, name='user_feedbacks'),
 
     path('dashboard/appointments/view/<int:appointment_id>/', appointment_view, name='appointment_view'),
@@ -87,6 +99,7 @@ urlpatterns = [
     path('dashboard/appointments/', appointment_list, name='appointment_list'),
     path('dashboard/appointments/create/interview/', create_interview_appointment, name='appointment_create_interview'),
     path('dashboard/appointments/create/one-on-one/', create_one_on_one_appointment, name='appointment_create_one_on_one'),
+    path('dashboard/appointments/availability/', slot_availability, name='slot_availability'),
 
     path('schedule-mock-interview/', schedule_mock_interview, name='schedule_mock_interview'),
     path('dashboard/appointments/<int:appointment_id>/upload-feedback/', upload_mock_feedback, name='upload_mock_feedback'),
@@ -10,9 +10,10 @@ from .models import (ChatQuestionAnswer,Invoice, CandidateChat,
                      SupportQuery,Notification,CalendarEvent,
                      MockInterviewFeedback,InterviewSlot,
                      Enrollment,Certificate,UserProgress,
-                     ChatEscalation, Badge, UserBadge, AnnualReview,
-                     Referral,)
+                     ChatEscalation, UserBadge, AnnualReview,
+                     Referral, UsageRecord, ResumeAnalysisJob, CalendarFeed,)
 
+from django.db import transaction
 from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
@@ -21,8 +22,9 @@ from datetime import date, timedelta
 import datetime
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import user_passes_test
-from django.db.models import Count
-from django.http import JsonResponse
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 import re
 import json
@@ -31,6 +33,10 @@ from django.contrib import messages
 from .gemini import ask_gemini
 from django.utils import timezone
 from django.utils.timezone import now
+from django.utils.http import (url_has_allowed_host_and_scheme, urlsafe_base64_decode,
+                               urlsafe_base64_encode)
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
 import razorpay
 from django.conf import settings
 import uuid
@@ -42,12 +48,20 @@ from django.utils import timezone
 from celery import shared_task 
 from decimal import Decimal
 from .decorators import rate_limit
+from .cache import cache_stats
+from .notifications import mark_read, mark_all_read, poll_updates
+from .emails import queue_email
+from .entitlements import get_entitlements, entitlements_for_profiles
+from .badges import queue_badge_check
+from .slots import availability, MAX_RANGE_DAYS
+from .ics import feed_chunks, feed_etag, schedule_version
+from .downloads import get_protected_file, serve_file
+from .resume_ai import start_analysis, report_url, load_report, fail_stale_jobs
+from .resume_text import (profile_tokens, match_score, matching_resume_hashes,
+                          queue_resume_indexing)
+from .pdf import (ensure_invoice_pdf, queue_invoice_render, queue_certificate_render,
+                  ensure_resume_report_pdf)
 import logging
-import base64  
-from io import BytesIO 
-from reportlab.lib.pagesizes import letter  # Added for PDF page size
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle  # Added for PDF styling
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer  # Added for PDF content
 logger = logging.getLogger(__name__)
 
 
@@ -342,7 +356,7 @@ def signup(request):
             
             # Get or create profile (ensures it exists even if signal fails)
             profile, created = Profile.objects.get_or_create(user=user)
-            profile.award_badges()
+            queue_badge_check(user.pk)
             
             # Authenticate and login
             user = authenticate(username=user.username, password=form.cleaned_data['password'])
@@ -350,12 +364,11 @@ def signup(request):
                 login(request, user)
                 
                 # Send welcome email
-                send_mail(
+                queue_email(
                     subject="Welcome to VCS Career Services!",
                     message=f"Hi {user.username},\n\nWelcome to VCS! Your account has been created successfully. Start exploring jobs and building your career.\n\nBest,\nVCS Team",
                     from_email="noreply@yourapp.com",
                     recipient_list=[user.email],
-                    fail_silently=True,
                 )
                 
                 return redirect('/')
@@ -397,12 +410,16 @@ def job_list(request):
             jobs = jobs.filter(is_exclusive=False)
 
         if profile.is_pro or profile.is_proplus:
+            tokens = profile_tokens(profile)
             for job in jobs:
-                score = SequenceMatcher(
-                    None,
-                    profile.skills.lower(),
-                    job.job_description.lower()
-                ).ratio() * 100
+                if tokens is not None:
+                    score = match_score(tokens, job.job_description)
+                else:
+                    score = SequenceMatcher(
+                        None,
+                        profile.skills.lower(),
+                        job.job_description.lower()
+                    ).ratio() * 100
                 job.match_score = round(score, 1)
 
         if saved == "1":
@@ -460,13 +477,9 @@ def job_detail(request, pk):
             user=request.user
         ).exists()
 
-        profile = request.user.profile
-
-        applications_used = profile.applications_this_month()
-
-        # 🔥 NEW SYSTEM
-        limits = profile.get_limits()
-        applications_limit = limits["applications"]
+        entitlements = request.user.profile.entitlements(request)
+        applications_used = entitlements.used("applications")
+        applications_limit = entitlements.limit("applications")
 
         if applications_limit is not None:
             limit_reached = applications_used >= applications_limit
@@ -489,7 +502,8 @@ def save_job(request, pk):
         if request.user in job.saved_by.all():
             job.saved_by.remove(request.user)
         else:
-            job.saved_by.add(request.user)    
+            job.saved_by.add(request.user)
+            queue_badge_check(request.user.pk)
     return redirect('job_detail', pk=pk)
 
 
@@ -514,6 +528,10 @@ def apply_job(request, pk):
         job=job,
         defaults={'resume': profile.resume}
     )
+    if created:
+        queue_badge_check(request.user.pk)
+        if application.resume:
+            queue_resume_indexing(application)
 
     if request.method == 'POST':
         form = JobApplicationForm(request.POST, request.FILES)
@@ -523,6 +541,8 @@ def apply_job(request, pk):
                 profile.save()
                 application.resume = profile.resume
                 application.save()
+                queue_resume_indexing(profile)
+                queue_resume_indexing(application)
 
             messages.success(request, "Job application submitted successfully!")
             if profile.is_proplus and job.recruiter_email:
@@ -546,12 +566,11 @@ def apply_job(request, pk):
                 Best regards,
                 VCS Career Services Team
                 """
-                send_mail(
+                queue_email(
                     subject=subject,
                     message=message,
                     from_email='noreply@yourapp.com',
                     recipient_list=[job.recruiter_email],
-                    fail_silently=True,
                 )
                 messages.info(request, "A recruiter introduction email has been sent on your behalf.")
 
@@ -564,68 +583,6 @@ def apply_job(request, pk):
         'form': form,
     })
 
-@login_required
-def profile(request):
-    profile, created = Profile.objects.get_or_create(user=request.user)
-
-    fields = [profile.phone, profile.bio, profile.education, profile.location,
-              profile.experience, profile.skills, profile.resume]
-    filled = sum(1 for f in fields if f)
-    completion = int((filled / len(fields)) * 100) 
-    
-    mock_feedbacks = MockInterviewFeedback.objects.filter(appointment__application__user=request.user)
-    subscription = getattr(request.user, "subscription", None)
-    enrollments = Enrollment.objects.filter(profile=request.user.profile).select_related('course')[:5]
-    certificates = Certificate.objects.filter(enrollment__profile=request.user.profile)
-    
-    badges = UserBadge.objects.filter(user=request.user)
-    
-    quota_data = {}
-    
-    # Applications (all tiers)
-    if profile.application_limit and profile.application_limit > 0:
-        quota_data['applications_percent'] = min((profile.applications_this_month / profile.application_limit) * 100, 100)
-    else:
-        quota_data['applications_percent'] = 100
-    
-    # Chatbot (Pro/Pro Plus)
-    if profile.is_pro or profile.is_proplus:
-        if profile.chatbot_limit and profile.chatbot_limit > 0:
-            quota_data['chatbot_percent'] = min((profile.chatbot_queries_this_month / profile.chatbot_limit) * 100, 100)
-        else:
-            quota_data['chatbot_percent'] = 100 
-    
-    # Resume Optimizations (Pro/Pro Plus)
-    if profile.is_pro or profile.is_proplus:
-        quota_data['resume_percent'] = min((profile.resume_optimizations_this_month / profile.resume_optimization_limit) * 100, 100)
-    
-    # Consultant Sessions (Pro/Pro Plus)
-    if profile.is_pro or profile.is_proplus:
-        quota_data['consultant_percent'] = min((profile.consultant_sessions_this_month / profile.consultant_session_limit) * 100, 100)
-    
-    # Mock Interviews (Pro Plus only)
-    if profile.is_proplus:
-        quota_data['mock_percent'] = min((profile.mock_interviews_this_month / profile.mock_interview_limit) * 100, 100)
-
-    if request.method == "POST":
-        form = ProfileForm(request.POST, request.FILES, instance=profile)
-        if form.is_valid():
-            form.save()
-    else:
-        form = ProfileForm(instance=profile)
-
-    return render(request, 'profile.html', {
-        'form': form,
-        'profile': profile,
-        'completion': completion,
-        'subscription': subscription,
-        'mock_feedbacks': mock_feedbacks,
-        'enrollments': enrollments,
-        'certificates': certificates,
-        'badges': badges, 
-        'quota_data': quota_data,  
-    })
-
 @login_required
 def upgrade_plan(request):
     profile = Profile.objects.get(user=request.user)
@@ -712,6 +669,30 @@ def subscription_dashboard(request):
         "invoices": invoices
     })
 
+@login_required
+def download_invoice(request, invoice_id):
+    invoice, _ = get_protected_file('invoice', invoice_id, request.user)
+    if invoice is None:
+        raise Http404("Invoice not found")
+
+    try:
+        ensure_invoice_pdf(invoice)
+    except Exception as e:
+        logger.error(f"Invoice render failed for {invoice.invoice_number}: {str(e)}")
+        messages.error(request, "Your invoice could not be generated right now. Please try again shortly.")
+        return redirect('subscription')
+
+    return serve_file(request, invoice.file, filename=f"{invoice.invoice_number}.pdf")
+
+@login_required
+def download_file(request, kind, pk):
+    if kind == 'invoice':
+        return download_invoice(request, pk)
+    obj, field_file = get_protected_file(kind, pk, request.user)
+    if obj is None or not field_file:
+        raise Http404("File not found")
+    return serve_file(request, field_file)
+
 @login_required
 def saved_jobs(request):
     jobs = request.user.saved_jobs.all()
@@ -728,13 +709,18 @@ def job_matching(request):
     jobs = Job.objects.all()
 
     matched_jobs = []
+    # Once the resume has been extracted, match on its full text as well as the skills.
+    tokens = profile_tokens(profile)
 
     for job in jobs:
-        score = SequenceMatcher(
-            None,
-            profile.skills.lower(),
-            job.job_description.lower()
-        ).ratio() * 100
+        if tokens is not None:
+            score = match_score(tokens, job.job_description)
+        else:
+            score = SequenceMatcher(
+                None,
+                profile.skills.lower(),
+                job.job_description.lower()
+            ).ratio() * 100
 
         matched_jobs.append({
             "job": job,
@@ -758,7 +744,15 @@ def ai_resume_optimizer(request):
         messages.error(request, "You need a Pro or Pro Plus plan to use this feature.")
         return redirect('upgrade_plan')
     
-    if not profile.can_optimize_resume():
+    analysis_job = None
+    job_id = request.GET.get('job', '')
+    if job_id.isdigit() and request.method != 'POST':
+        jobs = ResumeAnalysisJob.objects.filter(pk=int(job_id), user=user)
+        fail_stale_jobs(jobs)
+        analysis_job = jobs.first()
+
+    # Results of an analysis stay viewable after it used up the last optimization.
+    if analysis_job is None and not profile.can_optimize_resume():
         messages.error(request, f"You've reached your monthly limit of {profile.get_limits()['resume']} resume optimizations.")
         return redirect('profile')
     
@@ -767,126 +761,80 @@ def ai_resume_optimizer(request):
     matched_keywords = []
     missing_keywords = []
     suggestions = []
-    pdf_base64 = None
-    is_pdf = False  # Flag to indicate if it's PDF or text
-    
-    resume_optimization_limit = profile.get_limits()['resume']
-    resume_percent = (profile.resume_optimizations_this_month / resume_optimization_limit) * 100 if resume_optimization_limit else 0
+    report_download_url = None
+    job_title = request.POST.get('job_title', '')
+    resume_text = request.POST.get('resume_text', '')
     
     if request.method == 'POST':
-        job_title = request.POST.get('job_title')
-        resume_text = request.POST.get('resume_text')
-        
         if job_title and resume_text:
-            try:
-                # Craft concise prompt for analysis (fits 10-line limit, forces JSON)
-                prompt = f"""
-                Analyze the resume for the job: {job_title}.
-                Resume text (truncated): {resume_text[:500]}
-                
-                Return ONLY the JSON object, no other text:
-                {{"score": 85, "matched_keywords": ["Python", "Django"], "missing_keywords": ["React", "AWS"], "suggestions": ["Add cloud experience.", "Highlight projects."]}}
-                """
-                
-                # Call your ask_gemini function
-                response_text = ask_gemini(prompt)
-                
-                if response_text == "⚠️ AI service is temporarily unavailable.":
-                    raise Exception("AI service unavailable")
-                
-                # Debug: Print raw response to console
-                print("🔍 GEMINI RAW RESPONSE:", repr(response_text))
-                
-                # Parse JSON response (try direct first)
-                data = None
-                try:
-                    data = json.loads(response_text)
-                    print("✅ JSON PARSED DIRECTLY")
-                except json.JSONDecodeError:
-                    # Try regex to extract JSON
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    if json_match:
-                        try:
-                            data = json.loads(json_match.group(0))
-                            print("✅ JSON EXTRACTED VIA REGEX")
-                        except json.JSONDecodeError as e2:
-                            print("❌ REGEX EXTRACTION FAILED:", e2)
-                    else:
-                        print("❌ NO JSON FOUND IN RESPONSE")
-                
-                # Always generate downloadable content (PDF or text)
-                enhanced_resume_text = f"Enhanced Resume for {job_title}\n\n{resume_text}\n\nSuggestions Applied:\n" + "\n".join(suggestions if data else ["Review and refine based on job requirements."])
-                
-                if data:
-                    score = data.get('score', 0)
-                    matched_keywords = data.get('matched_keywords', [])
-                    missing_keywords = data.get('missing_keywords', [])
-                    suggestions = data.get('suggestions', [])
-                    
-                    # Try PDF generation
-                    try:
-                        buffer = BytesIO()
-                        doc = SimpleDocTemplate(buffer, pagesize=letter)
-                        styles = getSampleStyleSheet()
-                        title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=16, spaceAfter=12)
-                        normal_style = styles['Normal']
-                        
-                        story = [
-                            Paragraph(f"Enhanced Resume for {job_title}", title_style),
-                            Spacer(1, 12),
-                            Paragraph("Original Resume:", styles['Heading2']),
-                            Paragraph(resume_text.replace('\n', '<br/>'), normal_style),
-                            Spacer(1, 12),
-                            Paragraph("Suggestions Applied:", styles['Heading2']),
-                            Paragraph("<br/>".join(suggestions), normal_style),
-                        ]
-                        
-                        doc.build(story)
-                        pdf_bytes = buffer.getvalue()
-                        buffer.close()
-                        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-                        is_pdf = True
-                        print("✅ PDF GENERATED")
-                    except Exception as pdf_e:
-                        print("❌ PDF GENERATION FAILED:", pdf_e)
-                        # Fallback to text
-                        pdf_base64 = base64.b64encode(enhanced_resume_text.encode('utf-8')).decode('utf-8')
-                        is_pdf = False
-                else:
-                    # Fallback: Use text download
-                    messages.warning(request, "AI analysis completed, but response format was unexpected. Using basic feedback. Check logs for details.")
-                    score = 50
-                    matched_keywords = ["Analysis completed"]
-                    missing_keywords = ["Check job description"]
-                    suggestions = ["Review and refine based on job requirements."]
-                    pdf_base64 = base64.b64encode(enhanced_resume_text.encode('utf-8')).decode('utf-8')
-                    is_pdf = False
-                
-                # Increment usage
-                profile.resume_optimizations_this_month += 1
-                profile.save()
-                
-                messages.success(request, "Resume analyzed successfully!")
-            except Exception as e:
-                messages.error(request, f"Error analyzing resume: {str(e)}. Please try again.")
+            analysis_job = start_analysis(user, job_title, resume_text)
+            if analysis_job is None:
+                messages.error(request, f"You've reached your monthly limit of {profile.get_limits()['resume']} resume optimizations.")
+                return redirect('profile')
+            return redirect(f"{reverse('resume_ai')}?job={analysis_job.pk}")
         else:
             messages.error(request, "Please provide both job title and resume text.")
+
+    if analysis_job is not None:
+        job_title = analysis_job.job_title
+        resume_text = analysis_job.resume_text
+        if analysis_job.status == 'DONE':
+            result = analysis_job.result
+            score = result['score']
+            matched_keywords = result['matched_keywords']
+            missing_keywords = result['missing_keywords']
+            suggestions = result['suggestions']
+            report_download_url = report_url(result['report_id'])
+            if not result['complete']:
+                messages.warning(request, "AI suggestions are unavailable right now, so these are based on the keyword analysis only.")
+        elif analysis_job.status == 'FAILED':
+            messages.error(request, f"Error analyzing resume: {analysis_job.error}. Please try again.")
+
+    entitlements = profile.entitlements(request)
+    resume_optimization_limit = entitlements.limit('resume')
+    resume_percent = entitlements.percent('resume') if resume_optimization_limit else 0
     
     context = {
         'profile': profile,
+        'analysis_job': analysis_job,
         'score': score,
         'matched_keywords': matched_keywords,
         'missing_keywords': missing_keywords,
         'suggestions': suggestions,
-        'pdf_base64': pdf_base64,
-        'is_pdf': is_pdf,  # To show PDF or text in template
+        'report_download_url': report_download_url,
         'resume_optimization_limit': resume_optimization_limit,
         'resume_percent': resume_percent,
-        'job_title': request.POST.get('job_title', ''),
-        'resume_text': request.POST.get('resume_text', ''),
+        'job_title': job_title,
+        'resume_text': resume_text,
     }
     return render(request, "resume_ai.html", context)
 
+@login_required
+def resume_analysis_status(request, job_id):
+    jobs = ResumeAnalysisJob.objects.filter(pk=job_id, user=request.user)
+    fail_stale_jobs(jobs)
+    job = get_object_or_404(jobs)
+    data = {'id': job.pk, 'status': job.status, 'finished': job.is_finished}
+    if job.status == 'DONE':
+        data['result'] = {
+            'score': job.result['score'],
+            'matched_keywords': job.result['matched_keywords'],
+            'missing_keywords': job.result['missing_keywords'],
+            'suggestions': job.result['suggestions'],
+            'report_url': report_url(job.result['report_id']),
+        }
+    elif job.status == 'FAILED':
+        data['error'] = job.error
+    return JsonResponse(data)
+
+@login_required
+def resume_report_download(request, token):
+    report = load_report(token)
+    if report is None:
+        raise Http404("This download link is invalid or has expired.")
+    ensure_resume_report_pdf(report)
+    return serve_file(request, report.file, filename="enhanced_resume.pdf", as_attachment=True)
+
 @login_required
 def courses(request):
     profile = request.user.profile  
@@ -912,11 +860,14 @@ def profile(request):
     
 
     badges = UserBadge.objects.filter(user=request.user)
+    quota_data = profile.entitlements(request).quota_data()
     
     if request.method == "POST":
         form = ProfileForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
             form.save()
+            if 'resume' in form.changed_data:
+                queue_resume_indexing(profile)
     else:
         form = ProfileForm(instance=profile)
 
@@ -929,6 +880,9 @@ def profile(request):
         'enrollments': enrollments,
         'certificates': certificates,
         'badges': badges, 
+        'calendar_feed_url': _calendar_feed_url(request),
+        'quota_data': quota_data,
+        **quota_data,
     })
 
 @staff_member_required
@@ -988,7 +942,8 @@ def admin_candidates(request):
         profiles = profiles.filter(
             Q(user__username__icontains=q) |
             Q(skills__icontains=q) |
-            Q(location__icontains=q)
+            Q(location__icontains=q) |
+            Q(resume_sha256__in=matching_resume_hashes(q))
         )
 
     for profile in profiles:
@@ -1014,58 +969,7 @@ def admin_candidate_detail(request, user_id):
 
     skills_list = [skill.strip() for skill in profile.skills.split(',')] if profile.skills else []
 
-    limits = profile.get_limits()
-    quota_data = {}
-
-    def calculate_percent(used, limit):
-        """Safely calculate percentage"""
-        if limit is None:  # Unlimited
-            return 100
-        if limit == 0:
-            return 0
-        return min((used / limit) * 100, 100)
-
-    # Applications
-    applications_used = profile.applications_this_month()
-    app_limit = limits["applications"]
-
-    quota_data["applications_limit"] = app_limit
-    quota_data["applications_percent"] = calculate_percent(applications_used, app_limit)
-
-    # Chatbot
-    chatbot_used = profile.chatbot_queries_this_month
-    chatbot_limit = limits["chatbot"]
-
-    quota_data["chatbot_limit"] = chatbot_limit
-    quota_data["chatbot_percent"] = calculate_percent(chatbot_used, chatbot_limit)
-
-    # Resume Optimization
-    resume_used = profile.resume_optimizations_this_month
-    resume_limit = limits["resume"]
-
-    quota_data["resume_limit"] = resume_limit
-    quota_data["resume_percent"] = calculate_percent(resume_used, resume_limit)
-
-    # Consultant Sessions
-    consultant_used = profile.consultant_sessions_this_month
-    consultant_limit = limits["consultant_sessions"]
-
-    quota_data["consultant_limit"] = consultant_limit
-    quota_data["consultant_percent"] = calculate_percent(consultant_used, consultant_limit)
-
-    # Mock Interviews
-    mock_used = profile.mock_interviews_this_month
-    mock_limit = limits["mock_interviews"]
-
-    quota_data["mock_limit"] = mock_limit
-    quota_data["mock_percent"] = calculate_percent(mock_used, mock_limit)
-
-    # Course Enrollments
-    courses_used = profile.courses_enrolled_this_month
-    courses_limit = limits["courses"]
-
-    quota_data["courses_limit"] = courses_limit
-    quota_data["courses_percent"] = calculate_percent(courses_used, courses_limit)
+    quota_data = get_entitlements(profile, request).quota_data()
 
     return render(request, 'admin/admin_candidate_detail.html', {
         'profile': profile,
@@ -1096,12 +1000,11 @@ def schedule_interview(request, application_id):
             message=f"📅 Your interview for '{application.job.job_title}' has been scheduled on {scheduled_at}."
         )
 
-        send_mail(
+        queue_email(
             subject="Interview Scheduled",
             message=f"Hi {application.user.username},\n\nYour interview for '{application.job.job_title}' has been scheduled on {scheduled_at}.\n\nNotes: {notes}\n\nBest,\nVCS Team",
             from_email="noreply@yourapp.com",
             recipient_list=[application.user.email],
-            fail_silently=True,
         )
 
         return redirect("admin_candidate_detail", application.user.id)
@@ -1201,6 +1104,11 @@ def admin_analytics(request):
 
     return render(request, 'admin/analytics.html', context)
 
+@staff_member_required
+def cache_health(request):
+    stats = cache_stats()
+    return JsonResponse(stats, status=200 if stats['healthy'] else 503)
+
 @staff_member_required
 def admin_application_detail(request, application_id):
     application = get_object_or_404(JobApplication, id=application_id)
@@ -1211,13 +1119,14 @@ def admin_application_detail(request, application_id):
             old_status = application.status
             application.status = new_status
             application.save()
+            if new_status != old_status:
+                queue_badge_check(application.user_id)
 
-            send_mail(
+            queue_email(
                 subject="Job Application Status Update",
                 message=f"Hi {application.user.username},\n\nThe status of your application for '{application.job.job_title}' at {application.job.company_name} has changed from '{old_status}' to '{new_status}'.\n\nCheck your dashboard for more details.\n\nBest,\nVCS Team",
                 from_email="noreply@yourapp.com",
                 recipient_list=[application.user.email],
-                fail_silently=True,
             )
 
             return redirect('admin_application_detail', application_id=application.id)
@@ -1254,15 +1163,34 @@ def notification_processor(request):
 @login_required
 def notifications(request):
     notes = Notification.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, 'notifications.html', {'notifications': notes})
+    paginator = Paginator(notes, settings.NOTIFICATIONS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'notifications.html', {
+        'notifications': page_obj,
+        'page_obj': page_obj,
+    })
 
 @login_required
 def mark_notification_read(request, notification_id):
     note = get_object_or_404(Notification, id=notification_id, user=request.user)
-    note.is_read = True
-    note.save()
+    mark_read(note)
     return redirect('notifications')
 
+@login_required
+@require_POST
+def mark_all_notifications_read(request):
+    mark_all_read(request.user)
+    return redirect('notifications')
+
+@login_required
+def notification_poll(request):
+    """Cheap JSON poll for the navbar badge; see notifications.poll_updates."""
+    last_id = request.GET.get('last_id')
+    last_id = int(last_id) if last_id and last_id.isdigit() else None
+    response = JsonResponse(poll_updates(request.user, last_id))
+    response['Cache-Control'] = 'no-store'
+    return response
+
 @login_required
 def send_support_query(request):
     if request.method == "POST":
@@ -1305,12 +1233,11 @@ def reply_query(request, query_id):
             message=f"Admin replied to your query: {query.subject}"
         )
 
-        send_mail(
+        queue_email(
             subject=f"Reply to Your Query: {query.subject}",
             message=f"Hi {query.user.username},\n\nAdmin Reply: {reply_text}\n\nYour query has been resolved.\n\nBest,\nVCS Team",
             from_email="noreply@yourapp.com",
             recipient_list=[query.user.email],
-            fail_silently=True,
         )
 
     return redirect('admin_queries')
@@ -1380,7 +1307,7 @@ def payment_success(request):
         amount=amount,
         paid=True
     )
-    generate_invoice_pdf(invoice)
+    queue_invoice_render(invoice)
 
     # Clear session
     request.session.pop('plan', None)
@@ -1390,158 +1317,6 @@ def payment_success(request):
 
     return JsonResponse({"status": "success"})
 
-def generate_invoice_pdf(invoice):
-    from io import BytesIO
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-    from reportlab.pdfgen import canvas
-    from django.core.files.base import ContentFile
-    from django.conf import settings
-    import os
-
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=20,
-        alignment=1,  # Center
-        spaceAfter=20,
-        textColor=colors.darkblue
-    )
-    header_style = ParagraphStyle(
-        'Header',
-        parent=styles['Normal'],
-        fontSize=12,
-        alignment=0,
-        spaceAfter=10
-    )
-    table_header_style = ParagraphStyle(
-        'TableHeader',
-        parent=styles['Normal'],
-        fontSize=10,
-        alignment=1,
-        fontName='Helvetica-Bold'
-    )
-    table_cell_style = ParagraphStyle(
-        'TableCell',
-        parent=styles['Normal'],
-        fontSize=10,
-        alignment=0
-    )
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        alignment=1,
-        textColor=colors.gray
-    )
-
-    elements = []
-
-    # Company Header with Logo
-    logo_path = os.path.join(settings.STATIC_ROOT, 'logo.png')  # Replace with your logo path
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=1*inch, height=1*inch)
-        elements.append(logo)
-    elements.append(Spacer(1, 0.2*inch))
-
-    company_info = """
-    <b>VCS Career Services Pvt. Ltd.</b><br/>
-    123 Career Lane, Tech City<br/>
-    Bangalore, Karnataka 560001<br/>
-    India<br/>
-    GSTIN: 29ABCDE1234F1Z5<br/>
-    Email: support@vcs.com | Phone: +91-9876543210
-    """
-    elements.append(Paragraph(company_info, header_style))
-    elements.append(Spacer(1, 0.5*inch))
-
-    # Invoice Title
-    elements.append(Paragraph("INVOICE", title_style))
-    elements.append(Spacer(1, 0.3*inch))
-
-    # Invoice Details
-    invoice_details = f"""
-    <b>Invoice Number:</b> {invoice.invoice_number}<br/>
-    <b>Invoice Date:</b> {invoice.date.strftime('%d-%m-%Y')}<br/>
-    <b>Due Date:</b> {invoice.date.strftime('%d-%m-%Y')} (Immediate)<br/>
-    <b>Payment Status:</b> {'Paid' if invoice.paid else 'Pending'}
-    """
-    elements.append(Paragraph(invoice_details, header_style))
-    elements.append(Spacer(1, 0.3*inch))
-
-    # Bill To Section
-    bill_to = f"""
-    <b>Bill To:</b><br/>
-    {invoice.user.username}<br/>
-    {invoice.user.email}<br/>
-    (Subscription User)
-    """
-    elements.append(Paragraph(bill_to, header_style))
-    elements.append(Spacer(1, 0.3*inch))
-
-    # Itemized Table
-    data = [
-        ['Description', 'Quantity', 'Unit Price', 'Total'],
-        [f"{invoice.subscription.plan_name} Subscription ({invoice.subscription.billing_cycle})", '1', f"₹{invoice.amount}", f"₹{invoice.amount}"],
-    ]
-    table = Table(data, colWidths=[3*inch, 1*inch, 1.5*inch, 1.5*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 0.3*inch))
-
-    # Totals
-    subtotal = invoice.amount
-    gst = subtotal * Decimal('0.18') # 18% GST (adjust as needed)
-    total = subtotal + gst
-
-    totals_data = [
-        ['', 'Subtotal:', f"₹{subtotal}"],
-        ['', 'GST (18%):', f"₹{gst:.2f}"],
-        ['', 'Total:', f"₹{total:.2f}"],
-    ]
-    totals_table = Table(totals_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
-    totals_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (1, 0), (-1, -1), 'Helvetica-Bold'),
-        ('GRID', (1, 0), (-1, -1), 1, colors.black),
-    ]))
-    elements.append(totals_table)
-    elements.append(Spacer(1, 0.5*inch))
-
-    # Footer
-    footer_text = """
-    Thank you for choosing VCS Career Services!<br/>
-    Payment Terms: Immediate payment required. For queries, contact support@vcs.com.<br/>
-    This is a computer-generated invoice and does not require a signature.
-    """
-    elements.append(Paragraph(footer_text, footer_style))
-
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    invoice.file.save(
-        f"{invoice.invoice_number}.pdf",
-        ContentFile(buffer.read())
-    )
-    buffer.close()
-
 @recruiter_required
 def consultant_dashboard(request):
     applications = JobApplication.objects.select_related('user', 'job').order_by('-applied_at')[:10]  # Limit to 10 for performance
@@ -1571,7 +1346,8 @@ def appointment_list(request):
         Q(profile__is_pro=True) | Q(profile__is_proplus=True)
     ).select_related('profile')
 
-    todays_slots, created = InterviewSlot.objects.get_or_create(date=date.today())
+    today = timezone.localdate()
+    todays_slots = InterviewSlot.objects.filter(date=today).first() or InterviewSlot(date=today)
     context = {
         "appointments": appointments,
         "appt_type": appt_type,
@@ -1592,6 +1368,34 @@ def create_interview_appointment(request):
 def create_one_on_one_appointment(request):
     return _create_appointment(request, 'ONE_ON_ONE')
 
+@recruiter_required
+def slot_availability(request):
+    """
+    Free interview slots per day for ?start=YYYY-MM-DD&end=YYYY-MM-DD
+    (inclusive, default the current month), so the scheduler can mark full
+    days before submitting.
+    """
+    start_str = request.GET.get('start', '')
+    end_str = request.GET.get('end', '')
+    try:
+        start = date.fromisoformat(start_str) if start_str else timezone.localdate().replace(day=1)
+        if end_str:
+            end = date.fromisoformat(end_str)
+        else:
+            next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            end = next_month - timedelta(days=1)
+    except ValueError:
+        return JsonResponse({'error': 'Dates must be YYYY-MM-DD.'}, status=400)
+    if end < start or (end - start).days >= MAX_RANGE_DAYS:
+        return JsonResponse({'error': f'Range must be 1 to {MAX_RANGE_DAYS} days.'}, status=400)
+
+    days = availability(start, end)
+    return JsonResponse({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'availability': {day.isoformat(): free for day, free in days.items()},
+    })
+
 def _create_appointment(request, appointment_type):
     form = AppointmentForm(request.POST or None)
 
@@ -1601,43 +1405,43 @@ def _create_appointment(request, appointment_type):
             application = JobApplication.objects.filter(user=user).first()
             
             scheduled_date = form.cleaned_data['scheduled_at'].date()
-            slot, created = InterviewSlot.objects.get_or_create(date=scheduled_date)
-            if not slot.can_schedule():
-                return JsonResponse({'success': False, 'error': 'No available slots for this date.'})
-            
-            if not application:
-                first_job = Job.objects.first()
-                if not first_job:
-                    return JsonResponse({'success': False, 'error': 'No jobs available to create application.'})
-                application = JobApplication.objects.create(user=user, job=first_job)
+            if not application and not Job.objects.exists():
+                return JsonResponse({'success': False, 'error': 'No jobs available to create application.'})
 
-            appointment = form.save(commit=False)
-            appointment.application = application
-            appointment.consultant = request.user
-            appointment.appointment_type = appointment_type
-            appointment.set_sla()  # UPDATED: Set SLA
-            appointment.save()  
+            # The slot is taken and the appointment written in one transaction,
+            # so concurrent bookings cannot overbook a date.
+            with transaction.atomic():
+                if not InterviewSlot.reserve(scheduled_date):
+                    return JsonResponse({'success': False, 'error': 'No available slots for this date.'})
 
-            slot.increment_slots()
+                if not application:
+                    application = JobApplication.objects.create(user=user, job=Job.objects.first())
 
-            calendar_event = CalendarEvent.objects.create(
-                title=f"{appointment_type.replace('_',' ')} - {appointment.application.user.username}",
-                user=appointment.application.user,
-                start_time=appointment.scheduled_at,
-                end_time=appointment.scheduled_at + timezone.timedelta(hours=1),  
-                related_appointment=appointment
-            )
+                appointment = form.save(commit=False)
+                appointment.application = application
+                appointment.consultant = request.user
+                appointment.appointment_type = appointment_type
+                appointment.set_sla()  # UPDATED: Set SLA
+                appointment.save()  
+
+                calendar_event = CalendarEvent.objects.create(
+                    title=f"{appointment_type.replace('_',' ')} - {appointment.application.user.username}",
+                    user=appointment.application.user,
+                    start_time=appointment.scheduled_at,
+                    end_time=appointment.scheduled_at + timezone.timedelta(hours=1),  
+                    related_appointment=appointment
+                )
 
-            Notification.objects.create(
-                user=appointment.application.user,
-                message=f"Interview scheduled for {appointment.scheduled_at}."
-            )
-            
-            Interaction.objects.create(
-                application=appointment.application,
-                admin=request.user,
-                message=f"{appointment_type.replace('_',' ')} scheduled on {appointment.scheduled_at}"
-            )
+                Notification.objects.create(
+                    user=appointment.application.user,
+                    message=f"Interview scheduled for {appointment.scheduled_at}."
+                )
+                
+                Interaction.objects.create(
+                    application=appointment.application,
+                    admin=request.user,
+                    message=f"{appointment_type.replace('_',' ')} scheduled on {appointment.scheduled_at}"
+                )
 
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({'success': True})
@@ -1652,20 +1456,40 @@ def _create_appointment(request, appointment_type):
 
     return redirect(reverse('appointment_list') + f'?type={appointment_type}')
 
+def _move_slot(appointment, old_date, new_date):
+    """
+    Move an appointment's interview slot from old_date to new_date. Call it
+    in the transaction that saves the appointment; returns False, leaving
+    both dates untouched, if new_date is full. Mock interviews hold no slot.
+    """
+    if appointment.is_mock_interview or old_date == new_date:
+        return True
+    if not InterviewSlot.reserve(new_date):
+        return False
+    if old_date:
+        InterviewSlot.release(old_date)
+    return True
+
 @recruiter_required
 def edit_appointment(request, appointment_id):
     appointment = get_object_or_404(Appointment, id=appointment_id)
+    # Validation writes the posted values onto the instance.
+    old_date = timezone.localtime(appointment.scheduled_at).date() if appointment.scheduled_at else None
     form = AppointmentForm(request.POST or None, instance=appointment)
 
     if request.method == "POST" and form.is_valid():
         user = form.cleaned_data['user'] 
-        application = JobApplication.objects.filter(user=user).first()
-        if not application:
-            first_job = Job.objects.first()
-            application = JobApplication.objects.create(user=user, job=first_job)
+        with transaction.atomic():
+            if not _move_slot(appointment, old_date, form.cleaned_data['scheduled_at'].date()):
+                return JsonResponse({'success': False, 'error': 'No available slots for this date.'})
 
-        form.instance.application = application 
-        form.save()
+            application = JobApplication.objects.filter(user=user).first()
+            if not application:
+                first_job = Job.objects.first()
+                application = JobApplication.objects.create(user=user, job=first_job)
+
+            form.instance.application = application 
+            form.save()
 
         Interaction.objects.create(
             application=appointment.application,
@@ -1685,25 +1509,23 @@ def edit_appointment(request, appointment_id):
 @recruiter_required
 def postpone_appointment(request, appointment_id):
     appointment = get_object_or_404(Appointment, id=appointment_id)
+    # Validation writes the posted values onto the instance.
+    old_date = timezone.localtime(appointment.scheduled_at).date() if appointment.scheduled_at else None
     form = PostponeAppointmentForm(request.POST or None, instance=appointment)
 
     if request.method == "POST" and form.is_valid():
         user = form.cleaned_data.get('user')
-        if user:
-            application = JobApplication.objects.filter(user=user).first()
-            if not application:
-                first_job = Job.objects.first()
-                application = JobApplication.objects.create(user=user, job=first_job)
-            form.instance.application = application
-        form.save()
+        with transaction.atomic():
+            if not _move_slot(appointment, old_date, form.cleaned_data['scheduled_at'].date()):
+                return JsonResponse({'success': False, 'error': 'No available slots for this date.'})
 
-        if appointment.scheduled_at and (appointment.scheduled_at - now()).total_seconds() > 86400:
-            if appointment.is_mock_interview:
-                appointment.application.user.profile.decrement_mock_interviews()
-            else:
-                slot = InterviewSlot.objects.filter(date=appointment.scheduled_at.date()).first()
-                if slot:
-                    slot.decrement_slots()
+            if user:
+                application = JobApplication.objects.filter(user=user).first()
+                if not application:
+                    first_job = Job.objects.first()
+                    application = JobApplication.objects.create(user=user, job=first_job)
+                form.instance.application = application
+            form.save()
 
         if appointment.is_mock_interview and (appointment.scheduled_at - now()).total_seconds() > 86400:  # 24h
             appointment.application.user.profile.decrement_mock_interviews()
@@ -1755,12 +1577,11 @@ def upload_mock_feedback(request, appointment_id):
                 message="Your mock interview feedback is ready. Check your profile."
             )
 
-            send_mail(
+            queue_email(
                 subject="Mock Interview Feedback Available",
                 message="Your mock interview feedback report and improvement plan are now available. Log in to view them.",
                 from_email="noreply@yourapp.com",
                 recipient_list=[appointment.application.user.email],
-                fail_silently=True,
             )
 
             if appointment.status != 'DONE':
@@ -1793,17 +1614,64 @@ def mark_done_with_feedback(request, appointment_id):
         return JsonResponse({'success': True})
     return JsonResponse({'success': False}, status=400)
 
-@recruiter_required 
+APPOINTMENT_PAGE_SIZE = 50
+APPOINTMENT_MAX_PAGE_SIZE = 200
+
+APPOINTMENT_LIST_FIELDS = (
+    ("id", "id"),
+    ("candidate", "application__user__username"),
+    ("job", "application__job__job_title"),
+    ("type", "appointment_type"),
+    ("status", "status"),
+    ("scheduled_at", "scheduled_at"),
+    ("notes", "notes"),
+    ("interview_type", "interview_type"),
+    ("target_role", "target_role"),
+    ("is_mock", "is_mock_interview"),
+)
+
+
+def _encode_cursor(scheduled_at, pk):
+    return urlsafe_base64_encode(f"{scheduled_at.isoformat()}|{pk}".encode())
+
+
+def _decode_cursor(cursor):
+    """(scheduled_at, id) of the last row of the previous page, or None if malformed."""
+    try:
+        scheduled_at, pk = urlsafe_base64_decode(cursor).decode().split("|")
+        return datetime.datetime.fromisoformat(scheduled_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _day_start(value):
+    """Aware start of a YYYY-MM-DD day in the current time zone, or None."""
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        return None
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+@recruiter_required
 def appointment_list_api(request):
+    """
+    One page of appointments ordered by (scheduled_at, id). Pass the returned
+    next_cursor back as ?cursor= for the following page. start_date and
+    end_date are inclusive days, applied as a half-open scheduled_at range.
+    """
     q = request.GET.get("q", "")
     apptype = request.GET.get("type", "")
     status = request.GET.get("status", "")
-    start_date_str = request.GET.get("start_date", "")
-    end_date_str = request.GET.get("end_date", "")
+    start = _day_start(request.GET.get("start_date", ""))
+    end = _day_start(request.GET.get("end_date", ""))
+    try:
+        limit = min(int(request.GET.get("limit", APPOINTMENT_PAGE_SIZE)), APPOINTMENT_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = APPOINTMENT_PAGE_SIZE
+    limit = max(limit, 1)
 
-    appointments = Appointment.objects.select_related(
-        "application__user", "application__job"
-    ).order_by("scheduled_at")
+    appointments = Appointment.objects.order_by("scheduled_at", "id")
 
     if q:
         appointments = appointments.filter(
@@ -1816,36 +1684,33 @@ def appointment_list_api(request):
     if status:
         appointments = appointments.filter(status=status)
 
-    if start_date_str:
-        try:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-            appointments = appointments.filter(scheduled_at__date__gte=start_date)
-        except ValueError:
-            pass 
+    if start:
+        appointments = appointments.filter(scheduled_at__gte=start)
 
-    if end_date_str:
-        try:
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-            appointments = appointments.filter(scheduled_at__date__lte=end_date)
-        except ValueError:
-            pass  
-
-    data = []
-    for a in appointments:
-        data.append({
-            "id": a.id,
-            "candidate": a.application.user.username,
-            "job": a.application.job.job_title,
-            "type": a.appointment_type,
-            "status": a.status,
-            "datetime": a.scheduled_at.strftime("%d %b %Y %H:%M"),
-            "notes": a.notes,
-            "interview_type": a.interview_type or "N/A",
-            "target_role": a.target_role or "N/A", 
-            "is_mock": a.is_mock_interview,
-        })
+    if end:
+        appointments = appointments.filter(scheduled_at__lt=end + timedelta(days=1))
 
-    return JsonResponse(data, safe=False)
+    cursor = request.GET.get("cursor")
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return JsonResponse({"error": "Invalid cursor."}, status=400)
+        scheduled_at, pk = position
+        appointments = appointments.filter(
+            Q(scheduled_at__gt=scheduled_at) | Q(scheduled_at=scheduled_at, id__gt=pk)
+        )
+
+    keys = [key for key, _ in APPOINTMENT_LIST_FIELDS]
+    rows = list(appointments.values_list(*(field for _, field in APPOINTMENT_LIST_FIELDS))[:limit + 1])
+    has_more = len(rows) > limit
+    results = [dict(zip(keys, row)) for row in rows[:limit]]
+
+    next_cursor = None
+    if has_more:
+        last = results[-1]
+        next_cursor = _encode_cursor(last["scheduled_at"], last["id"])
+
+    return JsonResponse({"results": results, "next_cursor": next_cursor})
 
 @recruiter_required
 def appointment_view(request, appointment_id):
@@ -1889,23 +1754,102 @@ def user_feedbacks(request):
 
 @recruiter_required
 def admin_calendar(request):
-    return render(request, "admin/calendar.html")
+    return render(request, "admin/calendar.html", {
+        'calendar_feed_url': _calendar_feed_url(request),
+    })
+
+def _calendar_feed_url(request):
+    feed = CalendarFeed.for_user(request.user)
+    return request.build_absolute_uri(reverse('calendar_feed', args=[feed.token]))
+
+def calendar_feed(request, token):
+    """
+    ICS feed of a user's schedule for calendar apps, authenticated by the
+    secret token in the URL. Served from the cache until the schedule changes.
+    """
+    feed = CalendarFeed.objects.filter(token=token).values_list('user_id', 'user__username').first()
+    if feed is None:
+        raise Http404("Unknown calendar feed")
+    user_id, username = feed
+
+    today = timezone.localdate()
+    version = schedule_version(user_id)
+    etag = feed_etag(user_id, version, today)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = StreamingHttpResponse(
+            feed_chunks(user_id, f"{username} schedule", version, today),
+            content_type='text/calendar; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'inline; filename="schedule.ics"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+@require_POST
+def reset_calendar_feed(request):
+    CalendarFeed.for_user(request.user).rotate()
+    messages.success(request, "Your calendar link was reset. Update it in your calendar app.")
+    referer = request.META.get('HTTP_REFERER', '')
+    if url_has_allowed_host_and_scheme(referer, allowed_hosts={request.get_host()}):
+        return redirect(referer)
+    return redirect('profile')
+
+CALENDAR_MAX_WINDOW_DAYS = 366
+
+
+def _parse_calendar_bound(value):
+    """
+    Aware datetime for a calendar widget bound: an ISO date or datetime.
+    A '+' offset arrives as a space when the widget does not encode it.
+    """
+    value = value.strip().replace(' ', '+')
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
 
 @recruiter_required
 def calendar_events(request):
-    events = CalendarEvent.objects.select_related('related_appointment')
-    print(f"Fetching {events.count()} calendar events")
-    data = []
-    for e in events:
-        data.append({
-            "id": e.id,
-            "title": e.title,
-            "start": e.start_time.isoformat(),
-            "end": e.end_time.isoformat(),
-            "appointment_id": e.related_appointment.id if e.related_appointment else None,  # Optional: include related appointment
-        })
-
-    return JsonResponse(data, safe=False)
+    """
+    Events overlapping the ?start=&end= window (default: six weeks from the
+    start of the current month), optionally for one ?consultant=.
+    """
+    try:
+        if request.GET.get('start'):
+            start = _parse_calendar_bound(request.GET['start'])
+        else:
+            start = timezone.make_aware(datetime.datetime.combine(
+                timezone.localdate().replace(day=1), datetime.time.min
+            ))
+        if request.GET.get('end'):
+            end = _parse_calendar_bound(request.GET['end'])
+        else:
+            end = start + timedelta(weeks=6)
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'start and end must be ISO dates or datetimes.'}, status=400)
+    if end <= start or end - start > timedelta(days=CALENDAR_MAX_WINDOW_DAYS):
+        return JsonResponse({'error': f'Window must be 1 to {CALENDAR_MAX_WINDOW_DAYS} days.'}, status=400)
+
+    events = CalendarEvent.objects.filter(start_time__lt=end, end_time__gt=start)
+    consultant = request.GET.get('consultant', '')
+    if consultant:
+        if not consultant.isdigit():
+            return JsonResponse({'error': 'consultant must be a user id.'}, status=400)
+        events = events.filter(related_appointment__consultant_id=consultant)
+
+    keys = ("id", "title", "start", "end", "appointment_id")
+    rows = events.order_by('start_time', 'id').values_list(
+        'id', 'title', 'start_time', 'end_time', 'related_appointment_id'
+    )
+    return JsonResponse([dict(zip(keys, row)) for row in rows], safe=False)
 
 @login_required
 def enroll_course(request, course_id):
@@ -1972,7 +1916,10 @@ def admin_user_progress(request, enrollment_id):
                 enrollment.status = 'CERTIFIED'
                 enrollment.completed_at = timezone.now()
                 if enrollment.course.has_certificate:
-                    Certificate.objects.get_or_create(enrollment=enrollment)
+                    certificate, created = Certificate.objects.get_or_create(enrollment=enrollment)
+                    if created or not certificate.certificate_file:
+                        queue_certificate_render(certificate)
+                queue_badge_check(enrollment.profile.user_id)
             enrollment.save()
         messages.success(request, "Progress updated.")
         return redirect('admin_user_progress', enrollment_id=enrollment_id)
@@ -2021,11 +1968,7 @@ def admin_add_course(request):
     return render(request, 'admin/admin_add_course.html', {'form': form})
 
 def award_badges(user):
-    profile = user.profile
-    badges = Badge.objects.all()
-    for badge in badges:
-        if eval(badge.criteria): 
-            UserBadge.objects.get_or_create(user=user, badge=badge)
+    return user.profile.award_badges()
 
 @login_required
 def schedule_mock_interview(request):
@@ -2080,12 +2023,11 @@ def schedule_mock_interview(request):
                     message=f"Mock interview scheduled for {appointment.scheduled_at}. Video Link: {appointment.video_link}"
                 )
 
-                send_mail(
+                queue_email(
                     subject="Mock Interview Scheduled",
                     message=f"Your mock interview is scheduled for {appointment.scheduled_at}. Video Link: {appointment.video_link}. Type: {appointment.interview_type}, Role: {appointment.target_role}",
                     from_email="noreply@yourapp.com",
                     recipient_list=[request.user.email],
-                    fail_silently=True,
                 )
 
                 if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -2109,18 +2051,6 @@ def schedule_mock_interview(request):
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
-@shared_task
-def reset_monthly_quotas():
-    now = timezone.now()
-    if now.day == 1:
-        Profile.objects.update(
-            mock_interviews_this_month=0,
-            resume_optimizations_this_month=0,
-            chatbot_queries_this_month=0,
-            consultant_sessions_this_month=0,
-            applications_this_month=0
-        )
-
 @shared_task
 def check_sla_violations():
     overdue = Appointment.objects.filter(sla_due__lt=timezone.now(), sla_complied=False)
@@ -2163,16 +2093,24 @@ def admin_consultant_tracking(request):
     elif tier_filter == 'proplus':
         profiles = profiles.filter(is_proplus=True)
 
-    profiles = profiles.order_by('-consultant_hours_used_this_month')
+    current_hours = UsageRecord.objects.filter(
+        profile=OuterRef('pk'),
+        period=UsageRecord.current_period()
+    ).values('consultant_hours')[:1]
+    profiles = profiles.annotate(
+        current_consultant_hours=Coalesce(Subquery(current_hours), Decimal('0.00'))
+    ).order_by('-current_consultant_hours')
 
     consultant_data = []
+    profiles = list(profiles)
+    snapshots = entitlements_for_profiles(profiles)
 
     for profile in profiles:
-        limits = profile.get_limits()
+        entitlements = snapshots[profile.pk]
 
-        session_limit = limits["consultant_sessions"]
+        session_limit = entitlements.limit("consultant_sessions")
         limit_hours = float(session_limit) if session_limit is not None else None
-        used_hours = float(profile.consultant_hours_used_this_month)
+        used_hours = float(entitlements.consultant_hours)
 
         if limit_hours is None:
             percent = 100
@@ -2186,7 +2124,7 @@ def admin_consultant_tracking(request):
             'limit_hours': limit_hours,
             'used_hours': used_hours,
             'percent': percent,
-            'tier': profile.tier,
+            'tier': entitlements.tier,
         })
 
     total_hours = sum(data['used_hours'] for data in consultant_data)
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 import os
 from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -33,6 +35,43 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = 'kumaran2597@gmail.com'
 EMAIL_HOST_PASSWORD = os.getenv('your_app_password')
 
+# Outgoing mail is queued in EmailOutbox and delivered by a Celery worker.
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 6
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 60
+
+
+# Celery. Tasks run inline only in local development without a broker
+# (see CELERY_TASK_ALWAYS_EAGER below, after DEBUG).
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_BEAT_SCHEDULE = {
+    'drain-email-outbox': {
+        'task': 'VCS.tasks.drain_email_outbox',
+        'schedule': 60,
+    },
+    'purge-old-notifications': {
+        'task': 'VCS.tasks.purge_old_notifications',
+        'schedule': 60 * 60 * 24,
+    },
+    'award-badges': {
+        'task': 'VCS.tasks.award_badges_for_active_users',
+        'schedule': 60 * 15,
+    },
+    'fail-stale-resume-analyses': {
+        'task': 'VCS.tasks.fail_stale_resume_analyses',
+        'schedule': 60 * 5,
+    },
+}
+
+NOTIFICATION_FANOUT_BATCH_SIZE = 1000
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+NOTIFICATIONS_PER_PAGE = 20
+# Users evaluated per chunk by the periodic badge task
+BADGE_AWARD_BATCH_SIZE = 500
+# Seconds between the navbar's polls of the cached unread watermark.
+NOTIFICATION_POLL_INTERVAL = 15
+
 
 
 
@@ -49,6 +88,17 @@ SECRET_KEY = 'django-insecure-si%&85rp!b-m0)!ic@48*541&)+_aose*@a@!!m$*#&6__)v4i
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Outside DEBUG a broker is required: running tasks inline would put PDF
+# rendering, fan-outs and SMTP delivery back inside requests.
+CELERY_TASK_ALWAYS_EAGER = os.getenv(
+    "CELERY_TASK_ALWAYS_EAGER", str(DEBUG and not CELERY_BROKER_URL)
+).lower() == "true"
+if not CELERY_BROKER_URL and not CELERY_TASK_ALWAYS_EAGER:
+    raise ImproperlyConfigured(
+        "CELERY_BROKER_URL is not set. Configure a broker, or set "
+        "CELERY_TASK_ALWAYS_EAGER=true to run tasks inline (development only)."
+    )
+
 ALLOWED_HOSTS = ["*"]
 
 
@@ -162,6 +212,15 @@ LOGOUT_REDIRECT_URL = '/'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Upload folders under MEDIA_ROOT that may be served without a login. Every
+# other folder (resumes, invoices, certificates, feedback and resume
+# reports) is only reachable through the checked download views.
+PUBLIC_MEDIA_DIRS = ['badges/']
+# Protected downloads: None streams through Django, 'x-sendfile' (Apache,
+# lighttpd) or 'x-accel-redirect' (nginx) hands the body to the web server.
+DOWNLOADS_SENDFILE = os.getenv("DOWNLOADS_SENDFILE") or None
+# nginx `internal` location aliased to MEDIA_ROOT, used with x-accel-redirect
+DOWNLOADS_ACCEL_PREFIX = os.getenv("DOWNLOADS_ACCEL_PREFIX", "/protected-media/")
 SITE_ID = 1 
 SITE_ID = 2
 ACCOUNT_LOGOUT_REDIRECT_URL = '/'
@@ -193,8 +252,53 @@ SOCIALACCOUNT_EMAIL_AUTHENTICATION_AUTO_CONNECT = True
 
 
 
+# Cache profile. Pick the backend with CACHE_BACKEND:
+#   file   - FileBasedCache under CACHE_LOCATION (default, shared by every worker on the host)
+#   db     - DatabaseCache table in the main database (run `manage.py createcachetable` once)
+#   redis  - Redis / Valkey / KeyDB server at CACHE_LOCATION (needs the `redis` package)
+#   locmem - per-process memory, only useful for tests
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+
+_CACHE_BACKENDS = {
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "vcs_cache"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "vcs"),
+}
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',  # Or Redis for production
+        'BACKEND': _CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv("CACHE_LOCATION", _CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'KEY_PREFIX': 'vcs',
+        'VERSION': int(os.getenv("CACHE_VERSION", "1")),
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000} if CACHE_BACKEND != "redis" else {},
     }
 }
+
+# Per-subsystem key namespaces. Bump a version to invalidate every key of
+# that subsystem at once without touching the others; CACHE_VERSION above
+# still invalidates all of them.
+CACHE_NAMESPACES = {
+    'ratelimit': 1,
+    'notifications': 1,
+    'entitlements': 1,
+    'resume_ai': 3,
+    'slots': 1,
+    'calendar': 1,
+}
+
+# Seconds a user's plan limits and usage snapshot may be served from cache.
+ENTITLEMENTS_CACHE_TIMEOUT = 60
+
+# Resume optimizer results are cached by a hash of (job title, resume text).
+RESUME_AI_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Whether answering an identical re-submission from the cache counts
+# against the monthly resume optimization quota.
+RESUME_AI_CACHE_HITS_CONSUME_QUOTA = os.getenv("RESUME_AI_CACHE_HITS_CONSUME_QUOTA", "false").lower() == "true"
+# Seconds after which a resume analysis still pending or running is
+# failed and its optimization refunded.
+RESUME_ANALYSIS_STALE_AFTER = 60 * 10
+# Lifetime in seconds of the signed report download links on the results page.
+RESUME_REPORT_URL_MAX_AGE = 60 * 60
@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import os
+
 from django.contrib import admin
 from django.urls import path,include
 from django.conf import settings
@@ -29,6 +31,7 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    for folder in settings.PUBLIC_MEDIA_DIRS:
+        urlpatterns += static(settings.MEDIA_URL + folder, document_root=os.path.join(settings.MEDIA_ROOT, folder))
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 #
\ No newline at end of file